@@ -0,0 +1,57 @@
+# coding: utf-8
+
+# Submodules are only imported when one of their names is accessed, so that
+# e.g. `from datastructures import Heap` doesn't pay for the hash tables.
+
+from importlib import import_module
+
+
+_LAZY_NAMES = {
+    'Heap': 'heap',
+    'NumericHeap': 'heap',
+    'HashTableV1': 'hashtable',
+    'HashTableV2': 'hashtable',
+    'HashTableV3': 'hashtable',
+    'HashTableV4': 'hashtable',
+    'HashTableV5': 'hashtable',
+    'HashSet': 'hashset',
+    'HashMultiset': 'hashset',
+    'CowHashTable': 'cow',
+    'SharedHashTable': 'sharedtable',
+    'AdaptiveHashTable': 'adaptive',
+    'SortedKeyIndex': 'orderedindex',
+    'IndexedHashTable': 'orderedindex',
+    'Board': 'walks',
+    'Piece': 'walks',
+    'MoveGraph': 'walks',
+    'count_walks': 'walks',
+    'count_all_walks': 'walks',
+    'iter_walks': 'walks',
+    'Profiler': 'profiling',
+}
+
+_SUBMODULES = ['heap', 'hashtable', 'hashset', 'cow', 'sharedtable', 'adaptive', 'orderedindex', 'walks', 'profiling', 'trivia', 'bench']
+
+__all__ = sorted(_LAZY_NAMES)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return import_module('.' + name, __name__)
+
+    try:
+        submodule = _LAZY_NAMES[name]
+
+    except KeyError:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+    value = getattr(import_module('.' + submodule, __name__), name)
+
+    # Cache it, so next time this function is not even called
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__ + _SUBMODULES)
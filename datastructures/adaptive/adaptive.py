@@ -0,0 +1,328 @@
+# coding: utf-8
+
+from __future__ import unicode_literals, absolute_import, division
+
+from datastructures.hashset.hashset import _CountedTable
+from datastructures.hashtable.hashtable import HashTableV3, HashTableV4
+
+
+class _LinearTable(object):
+    """
+    Flat list of (key, key-hash, value) entries, scanned from start to end.
+    For a handful of entries, nothing beats it.
+
+    """
+
+    _key_match = staticmethod(HashTableV4._key_match)
+
+    def __init__(self):
+        self._entries = []
+
+    def _find_index(self, key, key_hash):
+        for idx, entry in enumerate(self._entries):
+            if self._key_match(key, key_hash, entry[0], entry[1]):
+                return idx
+
+        return None
+
+    def __setitem__(self, key, value):
+        key_hash = hash(key)
+        idx = self._find_index(key, key_hash)
+
+        if idx is None:
+            self._entries.append((key, key_hash, value))
+
+        else:
+            self._entries[idx] = key, key_hash, value
+
+    def __getitem__(self, key):
+        idx = self._find_index(key, hash(key))
+
+        if idx is None:
+            raise KeyError(key)
+
+        return self._entries[idx][2]
+
+    def __delitem__(self, key):
+        idx = self._find_index(key, hash(key))
+
+        if idx is None:
+            raise KeyError(key)
+
+        # Order doesn't matter, so just move the last one here
+        last = self._entries.pop()
+
+        if idx < len(self._entries):
+            self._entries[idx] = last
+
+    def entries(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _ProbeCountingTable(_CountedTable):
+    """
+    Open addressing table with the probing of HashTableV5, which counts how many slots
+    it visits, to find out if the hashes are clustering
+
+    """
+
+    def __init__(self):
+        super(_ProbeCountingTable, self).__init__()
+        self.reset_probe_stats()
+
+    def reset_probe_stats(self):
+        self.lookups = 0
+        self.probes = 0
+
+    def _find_position_for_key_and_hash(self, key, hash):
+        container = self._container
+        length = len(container)
+
+        first_seen_deleted = None
+        pos = hash % length
+        perturbation = hash
+        probes = 1
+
+        while True:
+            entry = container[pos]
+
+            if entry is self._DELETED_MARK:
+                if first_seen_deleted is None:
+                    first_seen_deleted = pos
+
+            elif entry is self._FREE_MARK:
+                break
+
+            elif self._key_match(key, hash, entry[0], entry[1]):
+                first_seen_deleted = None
+                break
+
+            pos = (5 * pos + 1 + perturbation) % length
+            perturbation >>= 5
+            probes += 1
+
+        self.lookups += 1
+        self.probes += probes
+
+        return pos if first_seen_deleted is None else first_seen_deleted
+
+    def __setitem__(self, key, value):
+        self._grow_if_necessary()
+
+        key_hash = hash(key)
+        pos = self._find_position_for_key_and_hash(key, key_hash)
+
+        if self._is_valid_entry(self._container[pos]):
+            self._container[pos] = key, key_hash, value
+
+        else:
+            self._insert_entry_at(pos, (key, key_hash, value))
+
+    def __delitem__(self, key):
+        pos = self._find_position_for_key_and_hash(key, hash(key))
+
+        if not self._is_valid_entry(self._container[pos]):
+            raise KeyError(key)
+
+        self._delete_entry_at(pos)
+        self._shrink_if_necessary()
+
+    def entries(self):
+        return self._entries()
+
+
+class _CountedChainedTable(HashTableV3):
+    """
+    HashTableV3 keeping count of entries and used buckets, instead of counting them
+    on every insertion, and mixing the bits of the hashes before picking the bucket,
+    so that hashes clustered in a few residues still spread evenly.
+
+    """
+
+    def __init__(self):
+        super(_CountedChainedTable, self).__init__()
+        self._count = 0
+        self._used_buckets = 0
+
+    @staticmethod
+    def _mix(key_hash):
+        # Multiplying by 2^64 / golden ratio spreads the low bits towards the high ones,
+        # and the xor brings the high bits back down, where the modulo looks at
+        mixed = (key_hash * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return mixed ^ (mixed >> 32)
+
+    def _get_bucket_for_hash(self, key_hash):
+        return self._container[self._mix(key_hash) % len(self._container)]
+
+    def _get_used_buckets_count(self):
+        return self._used_buckets
+
+    def __setitem__(self, key, value):
+        self._grow_if_necessary()
+
+        key_hash = hash(key)
+        bucket = self._get_bucket_for_hash(key_hash)
+
+        for idx, (stored_key, stored_key_hash, stored_value) in enumerate(bucket):
+            if self._key_match(key, key_hash, stored_key, stored_key_hash):
+                bucket[idx] = key, key_hash, value
+                return
+
+        if not bucket:
+            self._used_buckets += 1
+
+        bucket.append((key, key_hash, value))
+        self._count += 1
+
+    def __delitem__(self, key):
+        key_hash = hash(key)
+        bucket = self._get_bucket_for_hash(key_hash)
+
+        for idx, (stored_key, stored_hash, stored_val) in enumerate(bucket):
+            if self._key_match(key, key_hash, stored_key, stored_hash):
+                del bucket[idx]
+                self._count -= 1
+
+                if not bucket:
+                    self._used_buckets -= 1
+
+                self._shrink_if_necessary()
+                return
+
+        raise KeyError(key)
+
+    def _resize_buckets(self, n):
+        new_buckets = [[] for _ in range(n)]
+
+        for bucket in self._container:
+            for entry in bucket:
+                new_buckets[self._mix(entry[1]) % n].append(entry)
+
+        self._container = new_buckets
+        self._used_buckets = sum(1 for bucket in new_buckets if bucket)
+
+    def entries(self):
+        for bucket in self._container:
+            for entry in bucket:
+                yield entry
+
+    def __len__(self):
+        return self._count
+
+
+class AdaptiveHashTable(object):
+    """
+    HashTable/Dict that picks its strategy by itself, according to its size and how
+    well the hashes of the keys behave:
+
+    - 'linear': up to a few entries, a flat list scanned linearly.
+    - 'open_addressing': as it grows, open addressing with HashTableV5's probing.
+    - 'chained': if the probing sequences get long, which happens when the hashes are
+      clustered, buckets like HashTableV3 but mixing the bits of the hashes.
+
+    Moving between strategies reuses the stored hashes, no key is hashed again.
+
+    """
+
+    # Above this many entries, the linear scan is abandoned. Below half of it, it's
+    # taken back (only from open addressing).
+    _LINEAR_MAX_LEN = 8
+
+    # Every this many lookups on open addressing, the mean probing length is checked,
+    # and if it is above _MAX_MEAN_PROBES, the hashes are deemed bad
+    _PROBE_WINDOW = 256
+    _MAX_MEAN_PROBES = 3.0
+
+    def __init__(self):
+        self._table = _LinearTable()
+
+    @property
+    def strategy(self):
+        return self._STRATEGY_NAMES[type(self._table)]
+
+    def __setitem__(self, key, value):
+        self._table[key] = value
+        self._adapt()
+
+    def __getitem__(self, key):
+        try:
+            return self._table[key]
+
+        finally:
+            self._adapt()
+
+    def __delitem__(self, key):
+        del self._table[key]
+        self._adapt()
+
+    def items(self):
+        for key, _, value in self._table.entries():
+            yield key, value
+
+    def __len__(self):
+        return len(self._table)
+
+    def _adapt(self):
+        table = self._table
+        table_type = type(table)
+
+        if table_type is _LinearTable:
+            if len(table) > self._LINEAR_MAX_LEN:
+                self._move_to(_ProbeCountingTable())
+
+        elif table_type is _ProbeCountingTable:
+            if len(table) <= self._LINEAR_MAX_LEN // 2:
+                self._move_to(_LinearTable())
+
+            elif table.lookups >= self._PROBE_WINDOW:
+                if table.probes > self._MAX_MEAN_PROBES * table.lookups:
+                    self._move_to(_CountedChainedTable())
+
+                else:
+                    table.reset_probe_stats()
+
+    def _move_to(self, new_table):
+        new_table_type = type(new_table)
+
+        if new_table_type is _LinearTable:
+            new_table._entries = list(self._table.entries())
+
+        elif new_table_type is _ProbeCountingTable:
+            for entry in self._table.entries():
+                new_table._grow_if_necessary()
+                pos = new_table._find_position_for_key_and_hash(entry[0], entry[1])
+                new_table._insert_entry_at(pos, entry)
+
+            new_table.reset_probe_stats()
+
+        else:
+            entries = list(self._table.entries())
+
+            # Right number of buckets from the start, and then no more resizes
+            bucket_count = new_table._INITIAL_CONTAINER_LEN
+
+            while bucket_count * 2 / 3 <= len(entries):
+                bucket_count *= 2
+
+            new_table._resize_buckets(bucket_count)
+
+            for entry in entries:
+                bucket = new_table._container[new_table._mix(entry[1]) % bucket_count]
+
+                if not bucket:
+                    new_table._used_buckets += 1
+
+                bucket.append(entry)
+
+            new_table._count = len(entries)
+
+        self._table = new_table
+
+    _STRATEGY_NAMES = {
+        _LinearTable: 'linear',
+        _ProbeCountingTable: 'open_addressing',
+        _CountedChainedTable: 'chained',
+    }
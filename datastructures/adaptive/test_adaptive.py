@@ -0,0 +1,110 @@
+# coding: utf-8
+
+import random
+import string
+
+from pytest import raises
+
+from datastructures.adaptive.adaptive import AdaptiveHashTable
+
+
+def get_random_string(len=20):
+    return ''.join(random.choice(string.ascii_letters) for _ in range(len))
+
+
+def test_basic():
+    h = AdaptiveHashTable()
+
+    h['a'] = 1
+    h['a'] = 2
+    h['b'] = 3
+
+    assert h['a'] == 2
+    assert len(h) == 2
+    assert sorted(h.items()) == [('a', 2), ('b', 3)]
+
+    del h['a']
+
+    with raises(KeyError):
+        h['a']
+
+    with raises(KeyError):
+        del h['a']
+
+
+def test_grows_from_linear_to_open_addressing_and_back():
+    h = AdaptiveHashTable()
+    assert h.strategy == 'linear'
+
+    for i in range(h._LINEAR_MAX_LEN // 2):
+        h[get_random_string()] = i
+
+    assert h.strategy == 'linear'
+
+    keys = [get_random_string() for _ in range(1000)]
+
+    for key in keys:
+        h[key] = key
+
+    for key in keys:
+        assert h[key] == key
+
+    assert h.strategy == 'open_addressing'
+
+    for key in keys:
+        del h[key]
+
+    assert h.strategy == 'linear'
+    assert len(h) == h._LINEAR_MAX_LEN // 2
+
+
+def test_clustered_hashes_move_to_chained():
+    h = AdaptiveHashTable()
+
+    # Multiples of a big power of 2 all start probing at slot 0
+    keys = [i * 2 ** 32 for i in range(2000)]
+
+    for key in keys:
+        h[key] = key
+
+    assert h.strategy == 'chained'
+    assert len(h) == len(keys)
+
+    for key in keys:
+        assert h[key] == key
+
+    # The buckets are actually spread
+    assert max(map(len, h._table._container)) < 10
+
+
+def _test_matches_dict(make_key):
+    rng = random.Random(11)
+    h = AdaptiveHashTable()
+    reference = {}
+
+    for step in range(5000):
+        key = make_key(rng.randint(0, 500))
+
+        if key in reference and rng.random() < 0.4:
+            del h[key]
+            del reference[key]
+
+        else:
+            h[key] = step
+            reference[key] = step
+
+        assert len(h) == len(reference)
+
+    assert dict(h.items()) == reference
+
+    return h
+
+
+def test_matches_dict_with_good_hashes():
+    h = _test_matches_dict(str)
+    assert h.strategy == 'open_addressing'
+
+
+def test_matches_dict_with_clustered_hashes():
+    h = _test_matches_dict(lambda i: i * 2 ** 40)
+    assert h.strategy == 'chained'
@@ -0,0 +1,151 @@
+# coding: utf-8
+
+# Runs the benchmarks of every structure and outputs the results as JSON:
+#
+#     python -m datastructures.bench [heap] [hashtable] [knight_dialer] [--output results.json]
+#
+# Every benchmark is run twice: once to measure time, and once under tracemalloc to
+# measure the peak of memory allocated, since tracing slows everything down.
+
+from __future__ import unicode_literals, print_function
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from importlib import import_module
+from timeit import default_timer as timer
+
+
+def _bench_heap():
+    bench_heap = import_module('datastructures.heap.bench_heap')
+
+    return [
+        {'name': name, 'push_ops_per_sec': push_rate, 'pop_ops_per_sec': pop_rate}
+        for name, push_rate, pop_rate in bench_heap.run()
+    ]
+
+
+def _bench_hashtable():
+    bench_hashtable = import_module('datastructures.hashtable.bench_hashtable')
+
+    return [
+        {
+            'name': name,
+            'set_ops_per_sec': set_rate,
+            'get_ops_per_sec': get_rate,
+            'delete_ops_per_sec': del_rate,
+        }
+        for name, set_rate, get_rate, del_rate in bench_hashtable.run()
+    ]
+
+
+def _bench_knight_dialer():
+    knight_dialer = import_module('datastructures.trivia.knight_dialer')
+
+    runs = [
+        (fn, 16)
+        for fn in [knight_dialer.sol_1, knight_dialer.sol_2, knight_dialer.sol_3,
+                   knight_dialer.sol_4, knight_dialer.sol_5]
+    ]
+    runs += [(knight_dialer.sol_4, 5000), (knight_dialer.sol_5, 5000)]
+
+    results = []
+
+    for fn, hops in runs:
+        _, elapsed = knight_dialer.test(fn, hops, verbose=False)
+        results.append({'name': fn.__name__, 'hops': hops, 'elapsed': elapsed})
+
+    return results
+
+
+BENCHMARKS = {
+    'heap': _bench_heap,
+    'hashtable': _bench_hashtable,
+    'knight_dialer': _bench_knight_dialer,
+}
+
+
+def get_environment():
+    try:
+        numpy_version = import_module('numpy').__version__
+
+    except ImportError:
+        numpy_version = None
+
+    return {
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy_version': numpy_version,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+
+
+def run_benchmark(name, measure_memory=True):
+    fn = BENCHMARKS[name]
+
+    start = timer()
+    results = fn()
+    elapsed = timer() - start
+
+    report = {
+        'name': name,
+        'elapsed': elapsed,
+        'results': results,
+        'peak_memory_bytes': None,
+    }
+
+    if measure_memory:
+        tracemalloc.start()
+
+        try:
+            fn()
+            _, report['peak_memory_bytes'] = tracemalloc.get_traced_memory()
+
+        finally:
+            tracemalloc.stop()
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the data structure benchmarks')
+    parser.add_argument(
+        'benchmarks', nargs='*',
+        help='Benchmarks to run, out of %s. All of them if none given' % ', '.join(sorted(BENCHMARKS)),
+    )
+    parser.add_argument('--no-memory', action='store_true', help='Skip measuring memory')
+    parser.add_argument('--output', help='Write the JSON here instead of stdout')
+
+    args = parser.parse_args(argv)
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error('unknown benchmark %r' % (name,))
+
+    report = {
+        'environment': get_environment(),
+        'benchmarks': [
+            run_benchmark(name, measure_memory=not args.no_memory)
+            for name in args.benchmarks or sorted(BENCHMARKS)
+        ],
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
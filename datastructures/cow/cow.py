@@ -0,0 +1,312 @@
+# coding: utf-8
+
+from __future__ import unicode_literals, absolute_import, division
+
+import threading
+
+from datastructures.hashtable.hashtable import HashTableV5
+
+
+class _ChunkedTable(HashTableV5):
+    """
+    HashTableV5 whose container is split in chunks of fixed length, i.e. the slot `pos`
+    lives in self._chunks[pos >> self._chunk_bits][pos & self._chunk_mask].
+
+    Only reading is implemented here, which is shared by the mutable table and its
+    snapshots, so that both read equally fast.
+
+    """
+
+    # Slots per chunk: 2^_CHUNK_BITS. Small tables have a single, shorter, chunk.
+    _CHUNK_BITS = 7
+
+    def __init__(self):
+        # Not calling super().__init__ on purpose: there is no flat container
+        self._set_empty_chunks(self._INITIAL_CONTAINER_LEN)
+
+        # Valid entries, and valid entries + deleted marks
+        self._count = 0
+        self._used_slots = 0
+
+    def _set_empty_chunks(self, capacity):
+        # Capacities are always powers of 2
+        self._chunk_bits = min(self._CHUNK_BITS, capacity.bit_length() - 1)
+        self._chunk_mask = (1 << self._chunk_bits) - 1
+        self._capacity = capacity
+
+        chunk_len = 1 << self._chunk_bits
+        self._chunks = [[self._FREE_MARK] * chunk_len for _ in range(capacity // chunk_len)]
+
+    def _find_position_for_key_and_hash(self, key, hash):
+        """
+        Same as HashTableV5's, on top of chunks
+
+        """
+        chunks = self._chunks
+        bits = self._chunk_bits
+        mask = self._chunk_mask
+        capacity = self._capacity
+
+        first_seen_deleted = None
+        pos = hash % capacity
+
+        # Unsigned, see HashTableV5
+        perturbation = hash & 0xFFFFFFFFFFFFFFFF
+
+        while True:
+            entry = chunks[pos >> bits][pos & mask]
+
+            if entry is self._DELETED_MARK:
+                if first_seen_deleted is None:
+                    first_seen_deleted = pos
+
+            elif entry is self._FREE_MARK:
+                if first_seen_deleted is not None:
+                    return first_seen_deleted
+
+                return pos
+
+            elif self._key_match(key, hash, entry[0], entry[1]):
+                return pos
+
+            pos = (5 * pos + 1 + perturbation) % capacity
+            perturbation >>= 5
+
+    def _get_slot(self, pos):
+        return self._chunks[pos >> self._chunk_bits][pos & self._chunk_mask]
+
+    def _lookup_entry(self, key):
+        """
+        Returns the entry for the key, or None if not present.
+
+        Same probing as _find_position_for_key_and_hash, but reads don't care about
+        deleted marks, and the key matching is inlined. Otherwise the chunk indexing
+        would make reads slower than HashTableV5's.
+
+        """
+        key_hash = hash(key)
+
+        chunks = self._chunks
+        bits = self._chunk_bits
+        mask = self._chunk_mask
+        capacity = self._capacity
+        free_mark = self._FREE_MARK
+        deleted_mark = self._DELETED_MARK
+
+        pos = key_hash % capacity
+        perturbation = key_hash & 0xFFFFFFFFFFFFFFFF
+
+        while True:
+            entry = chunks[pos >> bits][pos & mask]
+
+            if entry is free_mark:
+                return None
+
+            if entry is not deleted_mark:
+                stored_key = entry[0]
+
+                # Same as _key_match
+                if stored_key is key or (entry[1] == key_hash and stored_key == key):
+                    return entry
+
+            pos = (5 * pos + 1 + perturbation) % capacity
+            perturbation >>= 5
+
+    def __getitem__(self, key):
+        entry = self._lookup_entry(key)
+
+        if entry is None:
+            raise KeyError(key)
+
+        return entry[2]
+
+    def get(self, key, default=None):
+        entry = self._lookup_entry(key)
+
+        return default if entry is None else entry[2]
+
+    def __contains__(self, key):
+        return self._lookup_entry(key) is not None
+
+    def _entries(self):
+        for chunk in self._chunks:
+            for entry in chunk:
+                if self._is_valid_entry(entry):
+                    yield entry
+
+    def items(self):
+        for key, _, value in self._entries():
+            yield key, value
+
+    def __iter__(self):
+        for entry in self._entries():
+            yield entry[0]
+
+    def __len__(self):
+        return self._count
+
+
+class CowHashTable(_ChunkedTable):
+    """
+    HashTableV5 with O(1) read-only snapshots and copies, based on copy-on-write.
+
+    Snapshots and copies share the chunks of the container with the table. Every table
+    has an ownership token, and each chunk is tagged with the token of the table that
+    may modify it in place. Taking a snapshot just renews the token, so that no chunk
+    is owned anymore, and the next write to a chunk copies it first (only that chunk).
+    The list of chunks itself is shared as well, and copied on the first write.
+
+    Threads: snapshot() and copy() can be called from any thread while another one
+    writes, they are serialized with the writes by a lock. Reading the table itself is
+    only safe from the writing thread, other threads should read snapshots instead.
+
+    """
+
+    def __init__(self):
+        super(CowHashTable, self).__init__()
+        self._token = object()
+        self._chunk_owners = [self._token] * len(self._chunks)
+        self._chunk_list_shared = False
+
+        # Otherwise a write could check the ownership of a chunk, then a snapshot be
+        # taken, and then the write modify the chunk, already shared with the snapshot
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """
+        Returns an immutable view of the current contents. O(1).
+
+        """
+        snapshot = HashTableSnapshot()
+
+        with self._lock:
+            self._share_with(snapshot)
+
+        return snapshot
+
+    def copy(self):
+        """
+        Returns an independent mutable copy. O(1), chunks are copied lazily by both.
+
+        """
+        clone = CowHashTable()
+
+        with self._lock:
+            self._share_with(clone)
+
+        # Owns nothing either, not even the list of chunks
+        clone._token = object()
+        clone._chunk_owners = self._chunk_owners
+        clone._chunk_list_shared = True
+
+        return clone
+
+    def _share_with(self, other):
+        other._chunks = self._chunks
+        other._chunk_bits = self._chunk_bits
+        other._chunk_mask = self._chunk_mask
+        other._capacity = self._capacity
+        other._count = self._count
+        other._used_slots = self._used_slots
+
+        # From now on, nothing is owned
+        self._token = object()
+        self._chunk_list_shared = True
+
+    def _set_slot(self, pos, entry):
+        if self._chunk_list_shared:
+            self._chunks = list(self._chunks)
+            self._chunk_owners = list(self._chunk_owners)
+            self._chunk_list_shared = False
+
+        chunk_idx = pos >> self._chunk_bits
+
+        if self._chunk_owners[chunk_idx] is not self._token:
+            self._chunks[chunk_idx] = list(self._chunks[chunk_idx])
+            self._chunk_owners[chunk_idx] = self._token
+
+        self._chunks[chunk_idx][pos & self._chunk_mask] = entry
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._set(key, value)
+
+    def _set(self, key, value):
+        self._grow_if_necessary()
+
+        key_hash = hash(key)
+        pos = self._find_position_for_key_and_hash(key, key_hash)
+        entry = self._get_slot(pos)
+
+        if not self._is_valid_entry(entry):
+            self._count += 1
+
+            if entry is self._FREE_MARK:
+                self._used_slots += 1
+
+        self._set_slot(pos, (key, key_hash, value))
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._delete(key)
+
+    def _delete(self, key):
+        pos = self._find_position_for_key_and_hash(key, hash(key))
+
+        if not self._is_valid_entry(self._get_slot(pos)):
+            raise KeyError(key)
+
+        self._set_slot(pos, self._DELETED_MARK)
+        self._count -= 1
+
+        self._shrink_if_necessary()
+
+    def _grow_if_necessary(self):
+        # Deleted marks count too, otherwise they could fill the whole container
+        if self._used_slots > 2 * self._capacity / 3:
+            if self._count > self._capacity / 3:
+                self._resize_container(self._capacity * 2)
+
+            else:
+                self._resize_container(self._capacity)
+
+    def _shrink_if_necessary(self):
+        if self._capacity == self._INITIAL_CONTAINER_LEN:
+            return
+
+        if self._count < self._capacity / 3:
+            self._resize_container(self._capacity // 2)
+
+    def _resize_container(self, n):
+        entries = list(self._entries())
+
+        # Brand new chunks, all of them owned
+        self._set_empty_chunks(n)
+        self._chunk_owners = [self._token] * len(self._chunks)
+        self._chunk_list_shared = False
+
+        chunks = self._chunks
+        bits = self._chunk_bits
+        mask = self._chunk_mask
+
+        for entry in entries:
+            pos = self._find_position_for_key_and_hash(entry[0], entry[1])
+            chunks[pos >> bits][pos & mask] = entry
+
+        self._used_slots = self._count
+
+
+class HashTableSnapshot(_ChunkedTable):
+    """
+    Immutable view of a CowHashTable at some point in time
+
+    """
+
+    def snapshot(self):
+        return self
+
+    def __setitem__(self, key, value):
+        raise TypeError('HashTableSnapshot is read-only')
+
+    def __delitem__(self, key):
+        raise TypeError('HashTableSnapshot is read-only')
@@ -0,0 +1,165 @@
+# coding: utf-8
+
+import random
+import sys
+import threading
+
+from pytest import raises
+
+from datastructures.cow.cow import CowHashTable, HashTableSnapshot
+
+
+def test_basic():
+    h = CowHashTable()
+
+    for i in range(1000):
+        h[i] = str(i)
+
+    assert len(h) == 1000
+    assert h[10] == '10'
+    assert 10 in h
+    assert h.get('nope') is None
+    assert dict(h.items()) == {i: str(i) for i in range(1000)}
+
+    for i in range(1000):
+        del h[i]
+
+    assert len(h) == 0
+    assert h._capacity < 100
+
+    with raises(KeyError):
+        h[10]
+
+    with raises(KeyError):
+        del h[10]
+
+
+def test_snapshot_is_not_affected_by_writes():
+    h = CowHashTable()
+
+    for i in range(500):
+        h[i] = i
+
+    snapshot = h.snapshot()
+
+    h[0] = 'changed'
+    del h[1]
+    h['new'] = 'new'
+
+    assert snapshot[0] == 0
+    assert snapshot[1] == 1
+    assert 'new' not in snapshot
+    assert len(snapshot) == 500
+    assert dict(snapshot.items()) == {i: i for i in range(500)}
+
+    assert h[0] == 'changed'
+    assert 1 not in h
+    assert len(h) == 500
+
+
+def test_snapshot_is_read_only():
+    snapshot = CowHashTable().snapshot()
+
+    assert isinstance(snapshot, HashTableSnapshot)
+    assert snapshot.snapshot() is snapshot
+
+    with raises(TypeError):
+        snapshot['a'] = 1
+
+    with raises(TypeError):
+        del snapshot['a']
+
+
+def test_writes_copy_only_the_touched_chunk():
+    h = CowHashTable()
+
+    for i in range(5000):
+        h[i] = i
+
+    snapshot = h.snapshot()
+    h[0] = 'changed'
+
+    shared = sum(1 for mine, theirs in zip(h._chunks, snapshot._chunks) if mine is theirs)
+    assert shared == len(h._chunks) - 1
+
+
+def test_copy_randomized():
+    rng = random.Random(3)
+    h = CowHashTable()
+    reference = {}
+    versions = []
+
+    for step in range(3000):
+        key = rng.randint(0, 300)
+
+        if rng.random() < 0.3 and key in reference:
+            del h[key]
+            del reference[key]
+
+        else:
+            h[key] = step
+            reference[key] = step
+
+        if step % 300 == 0:
+            versions.append((h.snapshot(), dict(reference)))
+
+        if step % 1000 == 999:
+            # Keep going on the copy, the original must stay frozen
+            original, h = h, h.copy()
+            versions.append((original, dict(reference)))
+
+    versions.append((h, reference))
+
+    for table, expected in versions:
+        assert len(table) == len(expected)
+        assert dict(table.items()) == expected
+
+
+def test_negative_hashes():
+    h = CowHashTable()
+    keys = [0, 1, 5, -8] + list(range(-1, -3000, -7))
+
+    for key in keys:
+        h[key] = key
+
+    assert all(h[key] == key for key in keys)
+    assert len(h) == len(keys)
+
+
+def test_snapshots_from_other_threads_while_writing():
+    h = CowHashTable()
+    snapshots = []
+
+    def write():
+        for i in range(20000):
+            h[i] = i
+
+    def take_snapshots():
+        while writer.is_alive():
+            snapshots.append(h.snapshot())
+
+    # Switch threads as often as possible, to interleave writes and snapshots
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    try:
+        writer = threading.Thread(target=write)
+        readers = [threading.Thread(target=take_snapshots) for _ in range(2)]
+        writer.start()
+
+        for reader in readers:
+            reader.start()
+
+        writer.join()
+
+        for reader in readers:
+            reader.join()
+
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert snapshots
+
+    # Once all the writes are done, every snapshot still holds exactly the first keys
+    for snapshot in snapshots:
+        assert dict(snapshot.items()) == {i: i for i in range(len(snapshot))}
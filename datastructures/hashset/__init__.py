@@ -0,0 +1,3 @@
+# coding: utf-8
+
+from .hashset import HashSet, HashMultiset
@@ -0,0 +1,380 @@
+# coding: utf-8
+
+from __future__ import unicode_literals, absolute_import, division
+
+from datastructures.hashtable.hashtable import HashTableV5
+
+
+class _CountedTable(HashTableV5):
+    """
+    Open addressing table that keeps track of how many slots are used, instead of
+    counting them every time like HashTableV4.__len__ does, which makes inserting n
+    items O(n^2).
+
+    Deleted marks are counted as used slots too: they also lengthen the probing
+    sequences, and if they were let to fill the container, probing for a missing key
+    would never find a free slot.
+
+    """
+
+    def __init__(self):
+        super(_CountedTable, self).__init__()
+
+        # Valid entries
+        self._count = 0
+
+        # Valid entries + deleted marks
+        self._used_slots = 0
+
+    def _grow_if_necessary(self):
+        if self._used_slots > 2 * len(self._container) / 3:
+            # If most of the used slots are deleted marks, cleaning them up is enough
+            if self._count > len(self._container) / 3:
+                self._resize_container(len(self._container) * 2)
+
+            else:
+                self._resize_container(len(self._container))
+
+    def _resize_container(self, n):
+        super(_CountedTable, self)._resize_container(n)
+        self._used_slots = self._count
+
+    def _insert_entry_at(self, pos, entry):
+        if self._container[pos] is self._FREE_MARK:
+            self._used_slots += 1
+
+        self._container[pos] = entry
+        self._count += 1
+
+    def _delete_entry_at(self, pos):
+        self._container[pos] = self._DELETED_MARK
+        self._count -= 1
+
+    def _find_entry(self, key, hash):
+        """
+        Returns the entry for the key, or None if not present
+
+        """
+        entry = self._container[self._find_position_for_key_and_hash(key, hash)]
+
+        return entry if self._is_valid_entry(entry) else None
+
+    def _entries(self):
+        for entry in self._container:
+            if self._is_valid_entry(entry):
+                yield entry
+
+    def _copy(self):
+        """
+        Returns a copy of the table. No entry gets rehashed nor relocated.
+
+        """
+        clone = type(self)()
+        clone._container = list(self._container)
+        clone._count = self._count
+        clone._used_slots = self._used_slots
+
+        return clone
+
+    def _from_entries(self, entries):
+        """
+        Returns a new table of the same type with the given entries, which must have
+        unique keys. Their stored hashes are reused.
+
+        """
+        result = type(self)()
+
+        for entry in entries:
+            result._grow_if_necessary()
+            result._insert_entry_at(result._find_position_for_key_and_hash(entry[0], entry[1]), entry)
+
+        return result
+
+    def _coerce(self, other):
+        return other if isinstance(other, type(self)) else type(self)(other)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key):
+        return self._find_entry(key, hash(key)) is not None
+
+    def __iter__(self):
+        for entry in self._entries():
+            yield entry[0]
+
+
+class HashSet(_CountedTable):
+    """
+    Set built on the probing of HashTableV5, whose entries are 2-tuples of (key, key-hash)
+
+    Bulk operations iterate over the smaller operand where possible, and reuse the
+    stored hashes, so nothing gets rehashed.
+
+    """
+
+    def __init__(self, keys=()):
+        super(HashSet, self).__init__()
+
+        for key in keys:
+            self.add(key)
+
+    def add(self, key):
+        self._grow_if_necessary()
+
+        key_hash = hash(key)
+        pos = self._find_position_for_key_and_hash(key, key_hash)
+
+        if not self._is_valid_entry(self._container[pos]):
+            self._insert_entry_at(pos, (key, key_hash))
+
+    def discard(self, key):
+        pos = self._find_position_for_key_and_hash(key, hash(key))
+
+        if self._is_valid_entry(self._container[pos]):
+            self._delete_entry_at(pos)
+            self._shrink_if_necessary()
+
+    def remove(self, key):
+        if key not in self:
+            raise KeyError(key)
+
+        self.discard(key)
+
+    def __setitem__(self, key, value):
+        raise TypeError('HashSet does not map keys to values, use add()')
+
+    def __getitem__(self, key):
+        raise TypeError('HashSet does not map keys to values, use `in`')
+
+    def __delitem__(self, key):
+        raise TypeError('HashSet does not map keys to values, use remove()')
+
+    def items(self):
+        raise TypeError('HashSet does not map keys to values, iterate over it')
+
+    def union(self, other):
+        other = self._coerce(other)
+        small, big = sorted([self, other], key=len)
+
+        result = big._copy()
+
+        for entry in small._entries():
+            result._grow_if_necessary()
+            pos = result._find_position_for_key_and_hash(entry[0], entry[1])
+
+            if not result._is_valid_entry(result._container[pos]):
+                result._insert_entry_at(pos, entry)
+
+        return result
+
+    def intersection(self, other):
+        other = self._coerce(other)
+        small, big = sorted([self, other], key=len)
+
+        return self._from_entries(
+            entry for entry in small._entries()
+            if big._find_entry(entry[0], entry[1]) is not None
+        )
+
+    def difference(self, other):
+        other = self._coerce(other)
+
+        # Either drop the few keys of `other` from a copy, or keep the few keys of `self`
+        if len(other) < len(self):
+            result = self._copy()
+
+            for key, key_hash in other._entries():
+                pos = result._find_position_for_key_and_hash(key, key_hash)
+
+                if result._is_valid_entry(result._container[pos]):
+                    result._delete_entry_at(pos)
+
+            return result
+
+        return self._from_entries(
+            entry for entry in self._entries()
+            if other._find_entry(entry[0], entry[1]) is None
+        )
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+
+class HashMultiset(_CountedTable):
+    """
+    Counter-like multiset built on the probing of HashTableV5, whose entries are
+    3-tuples of (key, key-hash, count). Missing keys have a count of 0.
+
+    Bulk operations behave like the ones of collections.Counter: union takes the max
+    of the counts, intersection the min, and difference subtracts keeping only
+    positive counts.
+
+    """
+
+    def __init__(self, keys=()):
+        super(HashMultiset, self).__init__()
+
+        for key in keys:
+            self.add(key)
+
+    def add(self, key, count=1):
+        self._grow_if_necessary()
+
+        key_hash = hash(key)
+        pos = self._find_position_for_key_and_hash(key, key_hash)
+        entry = self._container[pos]
+
+        if self._is_valid_entry(entry):
+            self._container[pos] = key, key_hash, entry[2] + count
+
+        else:
+            self._insert_entry_at(pos, (key, key_hash, count))
+
+    def remove(self, key, count=1):
+        """
+        Decrements the count of the key, forgetting it when it drops to zero or below
+
+        """
+        key_hash = hash(key)
+        pos = self._find_position_for_key_and_hash(key, key_hash)
+        entry = self._container[pos]
+
+        if not self._is_valid_entry(entry):
+            raise KeyError(key)
+
+        if entry[2] > count:
+            self._container[pos] = key, key_hash, entry[2] - count
+
+        else:
+            self._delete_entry_at(pos)
+            self._shrink_if_necessary()
+
+    def __getitem__(self, key):
+        entry = self._find_entry(key, hash(key))
+
+        return 0 if entry is None else entry[2]
+
+    def __setitem__(self, key, count):
+        if count <= 0:
+            self.pop(key, None)
+            return
+
+        self._grow_if_necessary()
+
+        key_hash = hash(key)
+        pos = self._find_position_for_key_and_hash(key, key_hash)
+
+        if self._is_valid_entry(self._container[pos]):
+            self._container[pos] = key, key_hash, count
+
+        else:
+            self._insert_entry_at(pos, (key, key_hash, count))
+
+    def __delitem__(self, key):
+        pos = self._find_position_for_key_and_hash(key, hash(key))
+
+        if not self._is_valid_entry(self._container[pos]):
+            raise KeyError(key)
+
+        self._delete_entry_at(pos)
+        self._shrink_if_necessary()
+
+    def pop(self, key, *default):
+        """
+        Forgets the key and returns its count
+
+        """
+        pos = self._find_position_for_key_and_hash(key, hash(key))
+        entry = self._container[pos]
+
+        if not self._is_valid_entry(entry):
+            if default:
+                return default[0]
+
+            raise KeyError(key)
+
+        self._delete_entry_at(pos)
+        self._shrink_if_necessary()
+
+        return entry[2]
+
+    def total(self):
+        return sum(entry[2] for entry in self._entries())
+
+    def elements(self):
+        """
+        Yields each key as many times as its count
+
+        """
+        for key, _, count in self._entries():
+            for _ in range(count):
+                yield key
+
+    def union(self, other):
+        other = self._coerce(other)
+        small, big = sorted([self, other], key=len)
+
+        result = big._copy()
+
+        for key, key_hash, count in small._entries():
+            result._grow_if_necessary()
+            pos = result._find_position_for_key_and_hash(key, key_hash)
+            entry = result._container[pos]
+
+            if not result._is_valid_entry(entry):
+                result._insert_entry_at(pos, (key, key_hash, count))
+
+            elif count > entry[2]:
+                result._container[pos] = key, key_hash, count
+
+        return result
+
+    def intersection(self, other):
+        other = self._coerce(other)
+        small, big = sorted([self, other], key=len)
+
+        def entries():
+            for key, key_hash, count in small._entries():
+                entry = big._find_entry(key, key_hash)
+
+                if entry is not None:
+                    yield key, key_hash, min(count, entry[2])
+
+        return self._from_entries(entries())
+
+    def difference(self, other):
+        other = self._coerce(other)
+
+        if len(other) < len(self):
+            result = self._copy()
+
+            for key, key_hash, count in other._entries():
+                pos = result._find_position_for_key_and_hash(key, key_hash)
+                entry = result._container[pos]
+
+                if not result._is_valid_entry(entry):
+                    continue
+
+                if entry[2] > count:
+                    result._container[pos] = key, key_hash, entry[2] - count
+
+                else:
+                    result._delete_entry_at(pos)
+
+            return result
+
+        def entries():
+            for key, key_hash, count in self._entries():
+                entry = other._find_entry(key, key_hash)
+                remaining = count if entry is None else count - entry[2]
+
+                if remaining > 0:
+                    yield key, key_hash, remaining
+
+        return self._from_entries(entries())
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
@@ -0,0 +1,185 @@
+# coding: utf-8
+
+from collections import Counter
+import random
+
+from pytest import raises
+
+from datastructures.hashset.hashset import HashSet, HashMultiset
+
+
+class CountedHash(object):
+    """
+    Key that counts how many times it gets hashed
+
+    """
+
+    hash_calls = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        CountedHash.hash_calls += 1
+        return hash(self.value)
+
+    def __eq__(self, other):
+        return isinstance(other, CountedHash) and self.value == other.value
+
+
+def test_set_basic():
+    s = HashSet(['a', 'b', 'a'])
+
+    assert len(s) == 2
+    assert 'a' in s
+    assert 'c' not in s
+    assert sorted(s) == ['a', 'b']
+
+    s.add('c')
+    s.discard('a')
+    s.discard('nope')
+
+    assert sorted(s) == ['b', 'c']
+
+    s.remove('b')
+
+    with raises(KeyError):
+        s.remove('b')
+
+    assert len(s) == 1
+
+
+def test_set_entries_are_key_and_hash():
+    s = HashSet(['a'])
+
+    assert [entry for entry in s._container if s._is_valid_entry(entry)] == [('a', hash('a'))]
+
+
+def test_set_is_not_a_mapping():
+    s = HashSet(['a'])
+
+    with raises(TypeError):
+        s['a'] = 1
+
+    with raises(TypeError):
+        s['a']
+
+
+def test_set_grow_and_shrink():
+    s = HashSet(range(1000))
+    assert len(s._container) > s._INITIAL_CONTAINER_LEN
+
+    for i in range(1000):
+        s.discard(i)
+
+    assert len(s) == 0
+    assert len(s._container) < 100
+
+
+def test_set_deleted_marks_do_not_fill_the_container():
+    s = HashSet()
+
+    # Keys come and go, the amount of them stays small
+    for i in range(1000):
+        s.add(i)
+        s.discard(i - 3)
+
+    assert len(s) == 3
+    assert 'missing' not in s
+
+
+def test_set_negative_hashes():
+    keys = [0, 1, 5, -8, -1, -2 ** 40]
+    s = HashSet(keys)
+
+    assert len(s) == len(keys)
+    assert all(key in s for key in keys)
+    assert -3 not in s
+
+    m = HashMultiset(keys)
+    assert m[-8] == 1
+
+
+def test_set_operations_randomized():
+    rng = random.Random(5)
+
+    for _ in range(50):
+        a = {rng.randint(0, 100) for _ in range(rng.randint(0, 80))}
+        b = {rng.randint(0, 100) for _ in range(rng.randint(0, 80))}
+        hash_a, hash_b = HashSet(a), HashSet(b)
+
+        assert set(hash_a | hash_b) == a | b
+        assert set(hash_a & hash_b) == a & b
+        assert set(hash_a - hash_b) == a - b
+        assert set(hash_b - hash_a) == b - a
+        assert set(hash_a.union(b)) == a | b
+
+        # Operands stay untouched
+        assert set(hash_a) == a
+        assert set(hash_b) == b
+
+
+def test_set_operations_do_not_rehash():
+    a = HashSet(CountedHash(i) for i in range(100))
+    b = HashSet(CountedHash(i) for i in range(50, 300))
+
+    CountedHash.hash_calls = 0
+
+    assert len(a | b) == 300
+    assert len(a & b) == 50
+    assert len(a - b) == 50
+    assert len(b - a) == 200
+
+    assert CountedHash.hash_calls == 0
+
+
+def test_multiset_basic():
+    m = HashMultiset('abracadabra')
+
+    assert m['a'] == 5
+    assert m['z'] == 0
+    assert len(m) == 5
+    assert m.total() == 11
+    assert sorted(m.elements()) == sorted('abracadabra')
+
+    m.add('z', 3)
+    m.remove('z')
+    assert m['z'] == 2
+
+    m.remove('z', 5)
+    assert 'z' not in m
+
+    with raises(KeyError):
+        m.remove('z')
+
+    m['b'] = 7
+    assert m['b'] == 7
+
+    m['b'] = 0
+    assert 'b' not in m
+
+    assert m.pop('a') == 5
+    assert m.pop('a', None) is None
+
+    del m['r']
+
+    with raises(KeyError):
+        del m['r']
+
+    assert dict(m.items()) == {'c': 1, 'd': 1}
+
+
+def test_multiset_operations_randomized():
+    rng = random.Random(6)
+
+    for _ in range(50):
+        a = [rng.randint(0, 30) for _ in range(rng.randint(0, 80))]
+        b = [rng.randint(0, 30) for _ in range(rng.randint(0, 80))]
+        hash_a, hash_b = HashMultiset(a), HashMultiset(b)
+
+        assert Counter(dict((hash_a | hash_b).items())) == Counter(a) | Counter(b)
+        assert Counter(dict((hash_a & hash_b).items())) == Counter(a) & Counter(b)
+        assert Counter(dict((hash_a - hash_b).items())) == Counter(a) - Counter(b)
+        assert Counter(dict((hash_b - hash_a).items())) == Counter(b) - Counter(a)
+
+        assert Counter(dict(hash_a.items())) == Counter(a)
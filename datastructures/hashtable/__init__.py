@@ -0,0 +1,3 @@
+# coding: utf-8
+
+from .hashtable import HashTableV1, HashTableV2, HashTableV3, HashTableV4, HashTableV5
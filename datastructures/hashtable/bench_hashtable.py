@@ -0,0 +1,70 @@
+# coding: utf-8
+
+# Micro-benchmark of set/get/delete throughput of every hash table variant, with
+# the builtin dict as reference.
+#
+# Keep n small: some of the early variants are quadratic.
+
+from __future__ import unicode_literals, print_function
+
+import random
+import string
+from timeit import default_timer as timer
+
+from datastructures.hashtable.hashtable import (
+    HashTableV1, HashTableV2, HashTableV3, HashTableV4, HashTableV5,
+)
+
+
+def _make_keys(n, seed=0):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(string.ascii_letters) for _ in range(20)) for _ in range(n)]
+
+
+def bench_table(cls, keys):
+    """
+    Returns the elapsed seconds of (setting, getting, deleting) every key
+
+    """
+    h = cls()
+
+    start = timer()
+
+    for key in keys:
+        h[key] = key
+
+    set_time = timer() - start
+    start = timer()
+
+    for key in keys:
+        h[key]
+
+    get_time = timer() - start
+    start = timer()
+
+    for key in keys:
+        del h[key]
+
+    return set_time, get_time, timer() - start
+
+
+def run(n=500):
+    """
+    Returns a list of (name, set ops/sec, get ops/sec, delete ops/sec)
+
+    """
+    keys = _make_keys(n)
+    results = []
+
+    for cls in [HashTableV1, HashTableV2, HashTableV3, HashTableV4, HashTableV5, dict]:
+        set_time, get_time, del_time = bench_table(cls, keys)
+        results.append((cls.__name__, n / set_time, n / get_time, n / del_time))
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, set_rate, get_rate, del_rate in run():
+        print('Class: %s, set: %.0f ops/sec, get: %.0f ops/sec, delete: %.0f ops/sec' % (
+            name, set_rate, get_rate, del_rate,
+        ))
@@ -209,7 +209,7 @@ class HashTableV3(object):
         raise KeyError(key)
 
     def _get_bucket_for_hash(self, key_hash):
-        return self._container[hash(key_hash) % len(self._container)]
+        return self._container[key_hash % len(self._container)]
 
     def items(self):
         for bucket in self._container:
@@ -384,7 +384,8 @@ class HashTableV4(object):
             if not self._is_valid_entry(entry):
                 continue
 
-            key, hash, _ = entry
+            # Entries start with key and hash, whatever comes after (see hashset module)
+            key, hash = entry[0], entry[1]
 
             self._container[self._find_position_for_key_and_hash(key, hash)] = entry
 
@@ -428,7 +429,9 @@ class HashTableV5(HashTableV4):
         first_seen_deleted = None
         pos = hash % len(self._container)
 
-        perturbation = hash
+        # Taken as unsigned, like CPython does. Shifting a negative number never gets
+        # to zero (-1 >> 5 == -1), so the probing could cycle forever among used slots
+        perturbation = hash & 0xFFFFFFFFFFFFFFFF
 
         while True:
             entry = self._container[pos]
@@ -5,7 +5,7 @@ from pytest import raises
 import string
 import random
 
-import hashtable
+from datastructures.hashtable import hashtable
 
 
 def get_random_string(len=20):
@@ -115,6 +115,45 @@ def _test_container_grow_and_shrink(cls):
         raise AssertionError('Bucket count did not shrink')
 
 
+class BigHash(object):
+    """
+    Key whose hash is not its own hash, i.e. hash(hash(key)) != hash(key)
+
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return 2 ** 62 + self.value
+
+    def __eq__(self, other):
+        return isinstance(other, BigHash) and self.value == other.value
+
+
+def _test_big_hashes_survive_resizing(cls):
+    h = cls()
+
+    for i in range(100):
+        h[BigHash(i)] = i
+
+    for i in range(100):
+        assert h[BigHash(i)] == i
+
+
+def _test_negative_hashes(cls):
+    h = cls()
+
+    # Used to send the probing of HashTableV5 into an endless cycle
+    keys = [0, 1, 5, -8] + [-random.randint(1, 2 ** 62) for _ in range(200)]
+
+    for key in keys:
+        h[key] = key
+
+    for key in keys:
+        assert h[key] == key
+
+
 test_basic_v1 = partial(_test_basic, hashtable.HashTableV1)
 test_set_twice_v1 = partial(_test_set_twice, hashtable.HashTableV1)
 test_exception_on_missing_key_v1 = partial(_test_exception_on_missing_key, hashtable.HashTableV1)
@@ -127,6 +166,8 @@ test_exception_on_missing_key_v2 = partial(_test_exception_on_missing_key, hasht
 test_delete_key_v2 = partial(_test_delete_key, hashtable.HashTableV2)
 test_container_doesnt_shrink_below_initial_count_v2 = partial(_test_container_doesnt_shrink_below_initial_count, hashtable.HashTableV2)
 test_container_grow_and_shrink_v2 = partial(_test_container_grow_and_shrink, hashtable.HashTableV2)
+test_big_hashes_survive_resizing_v2 = partial(_test_big_hashes_survive_resizing, hashtable.HashTableV2)
+test_negative_hashes_v2 = partial(_test_negative_hashes, hashtable.HashTableV2)
 
 
 test_basic_v3 = partial(_test_basic, hashtable.HashTableV3)
@@ -135,6 +176,8 @@ test_exception_on_missing_key_v3 = partial(_test_exception_on_missing_key, hasht
 test_delete_key_v3 = partial(_test_delete_key, hashtable.HashTableV3)
 test_container_doesnt_shrink_below_initial_count_v3 = partial(_test_container_doesnt_shrink_below_initial_count, hashtable.HashTableV3)
 test_container_grow_and_shrink_v3 = partial(_test_container_grow_and_shrink, hashtable.HashTableV3)
+test_big_hashes_survive_resizing_v3 = partial(_test_big_hashes_survive_resizing, hashtable.HashTableV3)
+test_negative_hashes_v3 = partial(_test_negative_hashes, hashtable.HashTableV3)
 
 test_basic_v4 = partial(_test_basic, hashtable.HashTableV4)
 test_set_twice_v4 = partial(_test_set_twice, hashtable.HashTableV4)
@@ -142,6 +185,8 @@ test_exception_on_missing_key_v4 = partial(_test_exception_on_missing_key, hasht
 test_delete_key_v4 = partial(_test_delete_key, hashtable.HashTableV4)
 test_container_doesnt_shrink_below_initial_count_v4 = partial(_test_container_doesnt_shrink_below_initial_count, hashtable.HashTableV4)
 test_container_grow_and_shrink_v4 = partial(_test_container_grow_and_shrink, hashtable.HashTableV4)
+test_big_hashes_survive_resizing_v4 = partial(_test_big_hashes_survive_resizing, hashtable.HashTableV4)
+test_negative_hashes_v4 = partial(_test_negative_hashes, hashtable.HashTableV4)
 
 test_basic_v5 = partial(_test_basic, hashtable.HashTableV5)
 test_set_twice_v5 = partial(_test_set_twice, hashtable.HashTableV5)
@@ -149,3 +194,5 @@ test_exception_on_missing_key_v5 = partial(_test_exception_on_missing_key, hasht
 test_delete_key_v5 = partial(_test_delete_key, hashtable.HashTableV5)
 test_container_doesnt_shrink_below_initial_count_v5 = partial(_test_container_doesnt_shrink_below_initial_count, hashtable.HashTableV5)
 test_container_grow_and_shrink_v5 = partial(_test_container_grow_and_shrink, hashtable.HashTableV5)
+test_big_hashes_survive_resizing_v5 = partial(_test_big_hashes_survive_resizing, hashtable.HashTableV5)
+test_negative_hashes_v5 = partial(_test_negative_hashes, hashtable.HashTableV5)
@@ -0,0 +1,87 @@
+# coding: utf-8
+
+# Micro-benchmark of push/pop throughput of Heap against the standard library heapq.
+#
+# heapq is a min-heap working on plain lists, whereas Heap is a max-heap, so heapq
+# is fed negated values to get the same pop order.
+
+from __future__ import unicode_literals, print_function
+
+import heapq
+import random
+from timeit import default_timer as timer
+
+from datastructures.heap.heap import Heap, NumericHeap
+
+
+def _make_items(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.random() for _ in range(n)]
+
+
+def bench_heap(items):
+    start = timer()
+
+    h = Heap([])
+
+    for item in items:
+        h.add(item)
+
+    push_time = timer() - start
+    start = timer()
+
+    for _ in range(len(items)):
+        h.pop()
+
+    return push_time, timer() - start
+
+
+def bench_heapq(items):
+    start = timer()
+
+    h = []
+
+    for item in items:
+        heapq.heappush(h, -item)
+
+    push_time = timer() - start
+    start = timer()
+
+    for _ in range(len(items)):
+        heapq.heappop(h)
+
+    return push_time, timer() - start
+
+
+def bench_numeric_heap(items):
+    start = timer()
+
+    h = NumericHeap()
+    h.push_many((item, idx) for idx, item in enumerate(items))
+
+    push_time = timer() - start
+    start = timer()
+
+    h.pop_many(len(items))
+
+    return push_time, timer() - start
+
+
+def run(n=100000):
+    """
+    Returns a list of (name, push ops/sec, pop ops/sec)
+
+    """
+    items = _make_items(n)
+    results = []
+
+    for fn in [bench_heap, bench_numeric_heap, bench_heapq]:
+        push_time, pop_time = fn(items)
+        results.append((fn.__name__, n / push_time, n / pop_time))
+
+    return results
+
+
+if __name__ == '__main__':
+    for name, push_rate, pop_rate in run():
+        print('Function: %s, push: %.0f ops/sec, pop: %.0f ops/sec' % (name, push_rate, pop_rate))
@@ -1,17 +1,22 @@
 # coding: utf-8
 
+from array import array
+
 
 class Heap(object):
 
-    def __init__(self, items, key=lambda x: x):
+    def __init__(self, items, key=lambda x: x, debug=False):
         """
         :param items: Initial elements of heap. More can be added later
         :param key: In the typical case of sorting objects according to some characteristic,
             this must be a function that gets an item and returns the value to sort on.
+        :param debug: If true, the heap condition is checked after every modification.
+            Useful while tinkering with the reordering code, but slow.
 
         """
         self._container = []
         self._key = key
+        self._debug = debug
 
         for item in items:
             self.add(item)
@@ -28,13 +33,16 @@ class Heap(object):
 
             # Heap condition satisfied
             if self._key(cont[idx]) < self._key(cont[parent_idx]):
-                return
+                break
 
             # Swap nodes and keep going
             cont[idx], cont[parent_idx] = cont[parent_idx], cont[idx]
 
             idx = parent_idx
 
+        if self._debug:
+            self._assert_invariant()
+
     @staticmethod
     def _get_parent_index(idx):
         if idx == 0:
@@ -70,6 +78,9 @@ class Heap(object):
         cont[0] = last_item
         self._reorder_heap_from_top()
 
+        if self._debug:
+            self._assert_invariant()
+
         return top_item
 
     def _reorder_heap_from_top(self):
@@ -95,14 +106,38 @@ class Heap(object):
                     cont[left_idx], cont[idx] = cont[idx], cont[left_idx]
                 return
 
-            # There are both left and right children. Get the highest, swap and keep going
-            if key(cont[left_idx]) > key(cont[right_idx]):
-                cont[left_idx], cont[idx] = cont[idx], cont[left_idx]
-                idx = left_idx
+            # There are both left and right children. Get the highest, and only
+            # if it beats the parent, swap and keep going
+            left_key = key(cont[left_idx])
+            right_key = key(cont[right_idx])
+
+            if left_key > right_key:
+                child_idx, child_key = left_idx, left_key
 
             else:
-                cont[right_idx], cont[idx] = cont[idx], cont[right_idx]
-                idx = right_idx
+                child_idx, child_key = right_idx, right_key
+
+            # Heap condition satisfied
+            if not child_key > key(cont[idx]):
+                return
+
+            cont[child_idx], cont[idx] = cont[idx], cont[child_idx]
+            idx = child_idx
+
+    def _assert_invariant(self):
+        """
+        Raises AssertionError if some node is smaller than any of its children
+
+        """
+        cont = self._container
+        key = self._key
+
+        for idx in range(1, len(cont)):
+            parent_idx = self._get_parent_index(idx)
+
+            assert not key(cont[idx]) > key(cont[parent_idx]), (
+                'Heap condition broken between positions %s and %s' % (parent_idx, idx)
+            )
 
     def _container_has_index(self, idx):
         return len(self._container) > idx
@@ -116,3 +151,236 @@ class Heap(object):
 
     def __len__(self):
         return len(self._container)
+
+
+class NumericHeap(object):
+    """
+    Max-heap specialised for float/int priorities, holding (priority, payload) pairs.
+
+    Priorities live in a compact array('d') instead of a list of arbitrary objects, and
+    next to it there is a parallel array of indices pointing to the slot where each
+    payload is kept. Payloads are never moved around while sifting, only their index.
+
+    Since the priorities are stored as doubles, int priorities come back as floats, and
+    ints beyond 2**53 lose precision (they may even tie with their neighbours). Use Heap
+    for those.
+
+    """
+
+    # Batches bigger than this fraction of the heap are appended and then the whole
+    # heap is rebuilt bottom-up, which is O(n), instead of sifting each item up
+    _HEAPIFY_RATIO = 0.5
+
+    def __init__(self, pairs=()):
+        """
+        :param pairs: Initial (priority, payload) pairs. More can be added later
+
+        """
+        self._priorities = array('d')
+        self._payload_indices = array('q')
+        self._payloads = []
+        self._free_payload_indices = []
+
+        self.push_many(pairs)
+
+    def push(self, priority, payload):
+        self._priorities.append(priority)
+        self._payload_indices.append(self._store_payload(payload))
+        self._sift_up(len(self._priorities) - 1)
+
+    def _store_payload(self, payload):
+        """
+        Stores the payload in a free slot and returns its index
+
+        """
+        if self._free_payload_indices:
+            payload_idx = self._free_payload_indices.pop()
+            self._payloads[payload_idx] = payload
+            return payload_idx
+
+        self._payloads.append(payload)
+        return len(self._payloads) - 1
+
+    def push_many(self, pairs):
+        pairs = list(pairs)
+
+        if not pairs:
+            return
+
+        if not self._priorities and self._bulk_build_vectorized(pairs):
+            return
+
+        if len(pairs) < self._HEAPIFY_RATIO * len(self._priorities):
+            for priority, payload in pairs:
+                self.push(priority, payload)
+
+            return
+
+        for priority, payload in pairs:
+            self._priorities.append(priority)
+            self._payload_indices.append(self._store_payload(payload))
+
+        self._heapify()
+
+    def _bulk_build_vectorized(self, pairs):
+        """
+        Builds the heap from scratch with NumPy. An array sorted in descending order
+        already satisfies the heap condition, so one vectorized sort does the job.
+
+        Returns False, doing nothing, if NumPy is not available.
+
+        """
+        numpy = _import_numpy()
+
+        if numpy is None:
+            return False
+
+        priorities = numpy.array([priority for priority, _ in pairs], dtype='d')
+        order = numpy.argsort(-priorities, kind='stable')
+
+        self._priorities = array('d', priorities[order].tobytes())
+        self._payload_indices = array('q', order.astype('q').tobytes())
+        self._payloads = [payload for _, payload in pairs]
+        self._free_payload_indices = []
+
+        return True
+
+    def _heapify(self):
+        for idx in reversed(range(len(self._priorities) // 2)):
+            self._sift_down(idx)
+
+    def _sift_up(self, idx):
+        prios = self._priorities
+        indices = self._payload_indices
+
+        priority = prios[idx]
+        payload_idx = indices[idx]
+
+        # Instead of swapping at every level, move the parents down and
+        # drop the new item once in its final position
+        while idx:
+            parent_idx = (idx - 1) >> 1
+
+            if not priority > prios[parent_idx]:
+                break
+
+            prios[idx] = prios[parent_idx]
+            indices[idx] = indices[parent_idx]
+            idx = parent_idx
+
+        prios[idx] = priority
+        indices[idx] = payload_idx
+
+    def _sift_down(self, idx):
+        prios = self._priorities
+        indices = self._payload_indices
+        length = len(prios)
+
+        priority = prios[idx]
+        payload_idx = indices[idx]
+
+        while True:
+            child_idx = 2 * idx + 1
+
+            if child_idx >= length:
+                break
+
+            right_idx = child_idx + 1
+
+            if right_idx < length and prios[right_idx] > prios[child_idx]:
+                child_idx = right_idx
+
+            if not prios[child_idx] > priority:
+                break
+
+            prios[idx] = prios[child_idx]
+            indices[idx] = indices[child_idx]
+            idx = child_idx
+
+        prios[idx] = priority
+        indices[idx] = payload_idx
+
+    def pop(self):
+        """
+        Removes and returns the (priority, payload) pair with highest priority
+
+        """
+        prios = self._priorities
+
+        if not prios:
+            raise IndexError('pop from empty heap')
+
+        top_priority = prios[0]
+        top_payload = self._release_payload(self._payload_indices[0])
+
+        last_priority = prios.pop()
+        last_payload_idx = self._payload_indices.pop()
+
+        if prios:
+            prios[0] = last_priority
+            self._payload_indices[0] = last_payload_idx
+            self._sift_down(0)
+
+        return top_priority, top_payload
+
+    def _release_payload(self, payload_idx):
+        payload = self._payloads[payload_idx]
+
+        # Drop the reference so the payload can be garbage collected
+        self._payloads[payload_idx] = None
+        self._free_payload_indices.append(payload_idx)
+
+        return payload
+
+    def pop_many(self, n):
+        """
+        Pops up to n pairs, in the same order as n calls to pop() would do
+
+        """
+        return [self.pop() for _ in range(min(n, len(self._priorities)))]
+
+    def peek(self):
+        if not self._priorities:
+            raise IndexError('peek on empty heap')
+
+        return self._priorities[0], self._payloads[self._payload_indices[0]]
+
+    def _assert_invariant(self):
+        """
+        Raises AssertionError if some priority is smaller than any of its children
+
+        """
+        prios = self._priorities
+
+        for idx in range(1, len(prios)):
+            parent_idx = (idx - 1) // 2
+
+            assert not prios[idx] > prios[parent_idx], (
+                'Heap condition broken between positions %s and %s' % (parent_idx, idx)
+            )
+
+    def __len__(self):
+        return len(self._priorities)
+
+
+_numpy = None
+
+
+def _import_numpy():
+    """
+    Returns the numpy module, or None if it's not installed. It's only imported
+    the first time it's needed, so that importing this module stays cheap.
+
+    """
+    global _numpy
+
+    if _numpy is None:
+        try:
+            import numpy
+
+        except ImportError:
+            numpy = False
+
+        _numpy = numpy
+
+    return _numpy or None
@@ -1,8 +1,13 @@
 # coding: utf-8
 
 
-from pytest import raises
-from heap import Heap
+import random
+import subprocess
+import sys
+
+from pytest import raises, importorskip
+from datastructures.heap import heap
+from datastructures.heap.heap import Heap, NumericHeap
 
 
 #                             0
@@ -99,3 +104,135 @@ def test_heap_by_key():
     assert h.pop() == items[1]
 
 
+def test_pop_does_not_sink_a_bigger_parent():
+    h = Heap([], debug=True)
+    h._container = [10, 9, 8, 1, 2, 7]
+
+    assert h.pop() == 10
+    assert h._container[0] == 9
+    h._assert_invariant()
+
+
+def test_assert_invariant():
+    h = Heap([3, 1, 2])
+    h._assert_invariant()
+
+    h._container = [1, 3, 2]
+
+    with raises(AssertionError):
+        h._assert_invariant()
+
+
+def test_pop_order_matches_sorted_randomized():
+    rng = random.Random(1234)
+
+    for _ in range(200):
+        items = [rng.randint(-50, 50) for _ in range(rng.randint(0, 60))]
+        h = Heap(items, debug=True)
+
+        popped = [h.pop() for _ in range(len(items))]
+        assert popped == sorted(items, reverse=True)
+
+
+def test_interleaved_add_pop_randomized():
+    rng = random.Random(4321)
+    key = lambda x: x[1]
+
+    for _ in range(100):
+        h = Heap([], key=key, debug=True)
+        reference = []
+
+        for i in range(rng.randint(0, 100)):
+            if reference and rng.random() < 0.4:
+                expected = max(map(key, reference))
+                item = h.pop()
+                assert key(item) == expected
+                reference.remove(item)
+
+            else:
+                item = (i, rng.random())
+                h.add(item)
+                reference.append(item)
+
+        assert len(h) == len(reference)
+
+
+def test_numeric_heap_push_pop():
+    h = NumericHeap()
+    h.push(3, 'c')
+    h.push(10, 'j')
+    h.push(1.5, 'a')
+
+    assert len(h) == 3
+    assert h.peek() == (10, 'j')
+    assert h.pop() == (10, 'j')
+    assert h.pop() == (3, 'c')
+    assert h.pop() == (1.5, 'a')
+
+    with raises(IndexError):
+        h.pop()
+
+    with raises(IndexError):
+        h.peek()
+
+
+def test_numeric_heap_push_many_pop_many_randomized():
+    rng = random.Random(99)
+    h = NumericHeap()
+    reference = []
+
+    for _ in range(50):
+        batch = [(rng.randint(0, 1000), rng.random()) for _ in range(rng.randint(0, 40))]
+        h.push_many(batch)
+        reference.extend(batch)
+        h._assert_invariant()
+
+        n = rng.randint(0, 30)
+        popped = h.pop_many(n)
+        h._assert_invariant()
+
+        reference.sort(key=lambda pair: pair[0], reverse=True)
+        assert [prio for prio, _ in popped] == [prio for prio, _ in reference[:n]]
+
+        for pair in popped:
+            reference.remove(pair)
+
+    assert len(h) == len(reference)
+    assert sorted(h.pop_many(len(h) + 10)) == sorted(reference)
+
+
+def test_numeric_heap_reuses_payload_slots():
+    h = NumericHeap([(i, str(i)) for i in range(10)])
+
+    h.pop_many(5)
+    h.push_many([(i, str(i)) for i in range(5)])
+
+    assert len(h._payloads) == 10
+
+
+def _test_numeric_heap_bulk_build(numpy_module, monkeypatch):
+    monkeypatch.setattr(heap, '_import_numpy', lambda: numpy_module)
+
+    pairs = [(float(i % 17), i) for i in range(200)]
+    h = NumericHeap(pairs)
+    h._assert_invariant()
+
+    popped = h.pop_many(len(pairs))
+    assert sorted(popped) == sorted(pairs)
+    assert [prio for prio, _ in popped] == sorted((prio for prio, _ in pairs), reverse=True)
+
+
+def test_numeric_heap_bulk_build_without_numpy(monkeypatch):
+    _test_numeric_heap_bulk_build(None, monkeypatch)
+
+
+def test_numeric_heap_bulk_build_with_numpy(monkeypatch):
+    numpy = importorskip('numpy')
+    _test_numeric_heap_bulk_build(numpy, monkeypatch)
+
+
+def test_importing_heap_does_not_import_numpy():
+    code = 'import sys; from datastructures import Heap, NumericHeap; NumericHeap(); print("numpy" in sys.modules)'
+    output = subprocess.check_output([sys.executable, '-c', code])
+
+    assert output.strip() == b'False'
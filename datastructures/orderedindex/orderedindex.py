@@ -0,0 +1,285 @@
+# coding: utf-8
+
+from __future__ import unicode_literals, absolute_import, division
+
+from bisect import bisect_left, bisect_right
+
+from datastructures.hashtable.hashtable import HashTableV5
+
+
+class SortedKeyIndex(object):
+    """
+    Set of mutually comparable keys kept in order, for range and min/max queries.
+
+    It's a two-level B+tree of sorts: keys live in a list of sorted blocks of bounded
+    length, plus a list with the last key of each block to bisect over. Inserting or
+    removing only shifts the elements of one block, instead of the whole list.
+
+    """
+
+    # Blocks are split when they grow longer than this
+    _MAX_BLOCK_LEN = 512
+
+    def __init__(self):
+        self._blocks = []
+
+        # Last (biggest) key of each block
+        self._maxes = []
+
+        self._len = 0
+
+    @classmethod
+    def from_sorted(cls, keys):
+        """
+        Builds the index in O(n) out of keys in strictly increasing order
+
+        """
+        keys = list(keys)
+
+        for prev, key in zip(keys, keys[1:]):
+            if not prev < key:
+                raise ValueError('Keys are not sorted or not unique: %r, %r' % (prev, key))
+
+        index = cls()
+
+        # Half full blocks, so that there is room for insertions before splitting
+        block_len = cls._MAX_BLOCK_LEN // 2
+        index._blocks = [keys[idx:idx + block_len] for idx in range(0, len(keys), block_len)]
+        index._maxes = [block[-1] for block in index._blocks]
+        index._len = len(keys)
+
+        return index
+
+    def add(self, key):
+        """
+        Adds the key. Returns whether it was not there before.
+
+        """
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return True
+
+        # Bigger than anything, goes to the last block
+        block_idx = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+        block = self._blocks[block_idx]
+        idx = bisect_left(block, key)
+
+        if idx < len(block) and block[idx] == key:
+            return False
+
+        block.insert(idx, key)
+        self._maxes[block_idx] = block[-1]
+        self._len += 1
+
+        if len(block) > self._MAX_BLOCK_LEN:
+            half = len(block) // 2
+            self._blocks.insert(block_idx + 1, block[half:])
+            self._maxes.insert(block_idx, block[half - 1])
+            del block[half:]
+
+        return True
+
+    def remove(self, key):
+        block_idx = bisect_left(self._maxes, key)
+
+        if block_idx == len(self._maxes):
+            raise KeyError(key)
+
+        block = self._blocks[block_idx]
+        idx = bisect_left(block, key)
+
+        if idx == len(block) or block[idx] != key:
+            raise KeyError(key)
+
+        del block[idx]
+        self._len -= 1
+
+        if block:
+            self._maxes[block_idx] = block[-1]
+
+        else:
+            del self._blocks[block_idx]
+            del self._maxes[block_idx]
+
+    def discard(self, key):
+        try:
+            self.remove(key)
+
+        except KeyError:
+            pass
+
+    def __contains__(self, key):
+        block_idx = bisect_left(self._maxes, key)
+
+        if block_idx == len(self._maxes):
+            return False
+
+        block = self._blocks[block_idx]
+        idx = bisect_left(block, key)
+
+        return idx < len(block) and block[idx] == key
+
+    def min_key(self):
+        if not self._blocks:
+            raise ValueError('min_key() on empty index')
+
+        return self._blocks[0][0]
+
+    def max_key(self):
+        if not self._blocks:
+            raise ValueError('max_key() on empty index')
+
+        return self._maxes[-1]
+
+    def bisect_left(self, key):
+        """
+        Returns how many keys are smaller than the given one
+
+        """
+        block_idx = bisect_left(self._maxes, key)
+
+        if block_idx == len(self._maxes):
+            return self._len
+
+        return self._count_before_block(block_idx) + bisect_left(self._blocks[block_idx], key)
+
+    def bisect_right(self, key):
+        """
+        Returns how many keys are smaller than or equal to the given one
+
+        """
+        block_idx = bisect_right(self._maxes, key)
+
+        if block_idx == len(self._maxes):
+            return self._len
+
+        return self._count_before_block(block_idx) + bisect_right(self._blocks[block_idx], key)
+
+    bisect = bisect_right
+
+    def _count_before_block(self, block_idx):
+        # O(n / block length)
+        return sum(len(block) for block in self._blocks[:block_idx])
+
+    def irange(self, lo=None, hi=None, inclusive=(True, True)):
+        """
+        Yields in order the keys between lo and hi. None means unbounded.
+
+        :param inclusive: Pair of booleans, whether lo and hi are included
+
+        """
+        include_lo, include_hi = inclusive
+
+        if lo is None:
+            block_idx, idx = 0, 0
+
+        else:
+            bisect_fn = bisect_left if include_lo else bisect_right
+            block_idx = bisect_fn(self._maxes, lo)
+
+            if block_idx == len(self._maxes):
+                return
+
+            idx = bisect_fn(self._blocks[block_idx], lo)
+
+        for block in self._blocks[block_idx:]:
+            for key in block[idx:]:
+                if hi is not None and (key > hi or (key == hi and not include_hi)):
+                    return
+
+                yield key
+
+            idx = 0
+
+    def __iter__(self):
+        for block in self._blocks:
+            for key in block:
+                yield key
+
+    def __len__(self):
+        return self._len
+
+
+class IndexedHashTable(object):
+    """
+    Wraps any HashTableV* (or anything dict-like) and keeps a SortedKeyIndex of its
+    keys in sync, for range and min/max key queries. Keys must be mutually comparable.
+
+    Point lookups go straight to the table, and only insertions of new keys and
+    deletions pay for maintaining the index.
+
+    """
+
+    def __init__(self, table=None):
+        """
+        :param table: Table to index, a new HashTableV5 if not given. Its existing
+            keys get indexed.
+
+        """
+        self._table = HashTableV5() if table is None else table
+        self._index = SortedKeyIndex.from_sorted(sorted(key for key, _ in self._table.items()))
+
+    @classmethod
+    def from_sorted_items(cls, items, table=None):
+        """
+        Bulk load out of (key, value) pairs in strictly increasing order of key.
+        The index is built in O(n).
+
+        """
+        items = list(items)
+
+        indexed = cls.__new__(cls)
+        indexed._table = HashTableV5() if table is None else table
+        indexed._index = SortedKeyIndex.from_sorted(key for key, _ in items)
+
+        for key, value in items:
+            indexed._table[key] = value
+
+        return indexed
+
+    @property
+    def table(self):
+        return self._table
+
+    def __setitem__(self, key, value):
+        self._table[key] = value
+        self._index.add(key)
+
+    def __getitem__(self, key):
+        return self._table[key]
+
+    def __delitem__(self, key):
+        del self._table[key]
+        self._index.remove(key)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def items(self):
+        return self._table.items()
+
+    def __len__(self):
+        return len(self._index)
+
+    def irange(self, lo=None, hi=None, inclusive=(True, True)):
+        return self._index.irange(lo, hi, inclusive)
+
+    def irange_items(self, lo=None, hi=None, inclusive=(True, True)):
+        for key in self._index.irange(lo, hi, inclusive):
+            yield key, self._table[key]
+
+    def min_key(self):
+        return self._index.min_key()
+
+    def max_key(self):
+        return self._index.max_key()
+
+    def bisect_left(self, key):
+        return self._index.bisect_left(key)
+
+    def bisect_right(self, key):
+        return self._index.bisect_right(key)
+
+    bisect = bisect_right
@@ -0,0 +1,147 @@
+# coding: utf-8
+
+import random
+from functools import partial
+
+from pytest import raises
+
+from datastructures.hashtable.hashtable import HashTableV3, HashTableV4, HashTableV5
+from datastructures.orderedindex.orderedindex import SortedKeyIndex, IndexedHashTable
+
+
+def test_index_basic():
+    index = SortedKeyIndex()
+
+    with raises(ValueError):
+        index.min_key()
+
+    assert index.add(5)
+    assert index.add(1)
+    assert not index.add(5)
+    assert index.add(3)
+
+    assert list(index) == [1, 3, 5]
+    assert len(index) == 3
+    assert 3 in index
+    assert 4 not in index
+    assert index.min_key() == 1
+    assert index.max_key() == 5
+
+    index.remove(3)
+
+    with raises(KeyError):
+        index.remove(3)
+
+    index.discard(3)
+    assert list(index) == [1, 5]
+
+
+def test_index_matches_sorted_list_across_blocks():
+    rng = random.Random(5)
+    index = SortedKeyIndex()
+    reference = set()
+
+    for _ in range(20000):
+        key = rng.randint(0, 3000)
+
+        if key in reference and rng.random() < 0.4:
+            index.remove(key)
+            reference.discard(key)
+
+        else:
+            index.add(key)
+            reference.add(key)
+
+    expected = sorted(reference)
+
+    assert len(index._blocks) > 1
+    assert list(index) == expected
+    assert len(index) == len(expected)
+
+    for key in [-1, 0, 17, 1500, 2999, 3000, 3001]:
+        lower = len([k for k in expected if k < key])
+        assert index.bisect_left(key) == lower
+        assert index.bisect_right(key) == lower + (key in reference)
+
+        assert list(index.irange(key, key + 300)) == [k for k in expected if key <= k <= key + 300]
+        assert list(index.irange(key, key + 300, inclusive=(False, False))) == [
+            k for k in expected if key < k < key + 300
+        ]
+
+    assert list(index.irange(hi=100)) == [k for k in expected if k <= 100]
+    assert list(index.irange(lo=2900)) == [k for k in expected if k >= 2900]
+
+
+def test_from_sorted():
+    keys = list(range(0, 3000, 3))
+    index = SortedKeyIndex.from_sorted(keys)
+
+    assert list(index) == keys
+    assert index.bisect_left(300) == 100
+    assert list(index.irange(10, 20)) == [12, 15, 18]
+
+    index.add(1)
+    index.remove(0)
+    assert index.min_key() == 1
+
+    with raises(ValueError):
+        SortedKeyIndex.from_sorted([1, 3, 2])
+
+    with raises(ValueError):
+        SortedKeyIndex.from_sorted([1, 1])
+
+
+def _test_indexed_table(table_cls):
+    rng = random.Random(3)
+    table = IndexedHashTable(table_cls())
+    reference = {}
+
+    for step in range(1500):
+        key = rng.randint(0, 300)
+
+        if key in reference and rng.random() < 0.3:
+            del table[key]
+            del reference[key]
+
+        else:
+            table[key] = step
+            reference[key] = step
+
+    assert len(table) == len(reference)
+    assert dict(table.items()) == reference
+    assert table.min_key() == min(reference)
+    assert table.max_key() == max(reference)
+    assert list(table.irange_items(50, 100)) == sorted(
+        (key, value) for key, value in reference.items() if 50 <= key <= 100
+    )
+
+    with raises(KeyError):
+        del table[-1]
+
+    assert len(table) == len(reference)
+
+
+test_indexed_table_v3 = partial(_test_indexed_table, HashTableV3)
+test_indexed_table_v4 = partial(_test_indexed_table, HashTableV4)
+test_indexed_table_v5 = partial(_test_indexed_table, HashTableV5)
+
+
+def test_indexed_table_indexes_existing_keys():
+    table = HashTableV5()
+    table['b'] = 2
+    table['a'] = 1
+
+    indexed = IndexedHashTable(table)
+    indexed['c'] = 3
+
+    assert list(indexed.irange()) == ['a', 'b', 'c']
+    assert indexed.bisect('b') == 2
+
+
+def test_indexed_table_from_sorted_items():
+    items = [(i, str(i)) for i in range(200)]
+    indexed = IndexedHashTable.from_sorted_items(items, table=HashTableV4())
+
+    assert indexed[150] == '150'
+    assert list(indexed.irange(10, 12)) == [10, 11, 12]
+    assert indexed.max_key() == 199
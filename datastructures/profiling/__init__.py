@@ -0,0 +1,3 @@
+# coding: utf-8
+
+from .profiling import Profiler, load_trace, replay
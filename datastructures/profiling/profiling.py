@@ -0,0 +1,267 @@
+# coding: utf-8
+
+# Opt-in instrumentation for the hash tables and heaps.
+#
+# A Profiler swaps the class of an instance by a subclass whose methods are wrapped
+# to count calls and wall time (inclusive of the inner calls, e.g. __setitem__ includes
+# the resizes it triggers). This reaches dunder methods, which are looked up on the type,
+# and internal calls like self._find_position_for_key_and_hash(), and leaves the rest of
+# instances untouched.
+#
+# Public operations can also be sampled to a ring buffer, dumped to a file and replayed
+# later against any variant, to find out which one works best for a real access pattern.
+
+from __future__ import unicode_literals, absolute_import, division
+
+import pickle
+import random
+from collections import deque
+from functools import wraps
+from timeit import default_timer as timer
+
+
+# Operations that change or read the contents, and therefore make sense to replay
+TRACED_OPERATIONS = [
+    '__setitem__', '__getitem__', '__delitem__', 'items',
+    'add', 'pop', 'peek',
+    'push', 'push_many', 'pop_many',
+]
+
+# Internal hot spots worth knowing about
+INTERNAL_OPERATIONS = [
+    '__len__',
+    '_grow_if_necessary', '_shrink_if_necessary',
+    '_resize_buckets', '_resize_container',
+    '_find_position_for_key_and_hash',
+    '_reorder_heap_from_top',
+    '_sift_up', '_sift_down', '_heapify',
+]
+
+# Name under which the calls to the key function of heaps are reported
+KEY_FUNCTION = 'key'
+
+# Replaying these exceptions is normal, e.g. a sampled trace may contain the deletion
+# of a key whose insertion was not sampled
+_EXPECTED_REPLAY_ERRORS = (KeyError, IndexError)
+
+
+class Profiler(object):
+    """
+    Collects call counts, wall times and traces of the instances it instruments
+
+    """
+
+    def __init__(self, trace_sample_rate=0.0, trace_buffer_size=100000, rng=None):
+        """
+        :param trace_sample_rate: Probability of each public operation to be traced.
+            0 disables tracing, 1 traces everything.
+        :param trace_buffer_size: Only this many of the last traced operations are kept.
+        :param rng: random.Random instance, for reproducible sampling
+
+        """
+        self._trace_sample_rate = trace_sample_rate
+        self._rng = rng or random.Random()
+        self._traces = deque(maxlen=trace_buffer_size)
+
+        # How many traced operations are running, one inside another
+        self._traced_depth = 0
+
+        # operation name -> [call count, total seconds]
+        self._stats = {}
+
+    def instrument(self, obj):
+        """
+        Starts profiling the given instance, which is returned for convenience
+
+        """
+        if getattr(type(obj), '_profiler', None) is self:
+            return obj
+
+        original_cls = type(obj)
+        namespace = {
+            name: self._wrap(name, getattr(original_cls, name))
+            for name in TRACED_OPERATIONS + INTERNAL_OPERATIONS
+            if hasattr(original_cls, name)
+        }
+        namespace['_profiler'] = self
+        namespace['_unprofiled_cls'] = original_cls
+
+        obj.__class__ = type(str('Profiled' + original_cls.__name__), (original_cls,), namespace)
+
+        if getattr(obj, '_key', None) is not None:
+            obj._key = self._wrap_function(KEY_FUNCTION, obj._key)
+
+        return obj
+
+    def uninstrument(self, obj):
+        """
+        Stops profiling the given instance, restoring its original class
+
+        """
+        if getattr(type(obj), '_profiler', None) is not self:
+            raise ValueError('Instance not instrumented by this profiler')
+
+        obj.__class__ = type(obj)._unprofiled_cls
+
+        if getattr(obj, '_key', None) is not None:
+            obj._key = obj._key.__wrapped__
+
+    def _wrap(self, name, method):
+        traced = name in TRACED_OPERATIONS
+        record = self._record
+
+        if name == 'items':
+            # Generators do their work while being consumed, not when called
+            @wraps(method)
+            def wrapper(instance, *args, **kwargs):
+                if not self._traced_depth:
+                    self._maybe_trace(name, args, kwargs)
+
+                start = timer()
+
+                try:
+                    for item in method(instance, *args, **kwargs):
+                        yield item
+
+                finally:
+                    record(name, timer() - start)
+
+            return wrapper
+
+        @wraps(method)
+        def wrapper(instance, *args, **kwargs):
+            if traced:
+                if name == 'push_many':
+                    # Could be an iterator, which can only be consumed once
+                    if args:
+                        args = (list(args[0]),) + args[1:]
+
+                    elif 'pairs' in kwargs:
+                        kwargs['pairs'] = list(kwargs['pairs'])
+
+                # Operations implemented on top of others (e.g. pop_many calling pop)
+                # must be replayed only once
+                if not self._traced_depth:
+                    self._maybe_trace(name, args, kwargs)
+
+                self._traced_depth += 1
+
+            start = timer()
+
+            try:
+                return method(instance, *args, **kwargs)
+
+            finally:
+                record(name, timer() - start)
+
+                if traced:
+                    self._traced_depth -= 1
+
+        return wrapper
+
+    def _wrap_function(self, name, fn):
+        record = self._record
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = timer()
+
+            try:
+                return fn(*args, **kwargs)
+
+            finally:
+                record(name, timer() - start)
+
+        return wrapper
+
+    def _record(self, name, elapsed):
+        stats = self._stats.get(name)
+
+        if stats is None:
+            stats = self._stats[name] = [0, 0.0]
+
+        stats[0] += 1
+        stats[1] += elapsed
+
+    def _maybe_trace(self, name, args, kwargs):
+        if self._trace_sample_rate and self._rng.random() < self._trace_sample_rate:
+            self._traces.append((name, args, kwargs))
+
+    def report(self):
+        """
+        Returns a dict of operation name -> dict with calls, total_time and mean_time
+
+        """
+        return {
+            name: {'calls': calls, 'total_time': total, 'mean_time': total / calls}
+            for name, (calls, total) in self._stats.items()
+        }
+
+    def get_trace(self):
+        """
+        Returns the traced operations as a list of (operation name, positional
+        arguments, keyword arguments)
+
+        """
+        return list(self._traces)
+
+    def dump_trace(self, f):
+        """
+        Writes the traced operations to the given binary file object
+
+        """
+        pickle.dump(self.get_trace(), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def reset(self):
+        self._stats.clear()
+        self._traces.clear()
+
+
+def load_trace(f):
+    """
+    Reads a trace written by Profiler.dump_trace() from the given binary file object
+
+    """
+    return pickle.load(f)
+
+
+def replay(trace, factories, repeat=1):
+    """
+    Replays the trace against fresh instances built by each factory, and returns a dict
+    of factory name -> best elapsed seconds out of `repeat` runs
+
+    :param factories: dict of name -> callable without arguments returning an instance,
+        e.g. {'v4': HashTableV4, 'v5': HashTableV5, 'heap': lambda: Heap([])}
+
+    """
+    results = {}
+
+    for name, factory in factories.items():
+        timings = []
+
+        for _ in range(repeat):
+            instance = factory()
+            start = timer()
+            _apply(instance, trace)
+            timings.append(timer() - start)
+
+        results[name] = min(timings)
+
+    return results
+
+
+def _apply(instance, trace):
+    for operation in trace:
+        # Keyword arguments can be left out, e.g. in hand-written traces
+        name, args = operation[0], operation[1]
+        kwargs = operation[2] if len(operation) > 2 else {}
+
+        try:
+            result = getattr(instance, name)(*args, **kwargs)
+
+            if name == 'items':
+                for _ in result:
+                    pass
+
+        except _EXPECTED_REPLAY_ERRORS:
+            pass
@@ -0,0 +1,171 @@
+# coding: utf-8
+
+import io
+import random
+
+from pytest import raises
+
+from datastructures.hashset.hashset import HashMultiset
+from datastructures.hashtable.hashtable import HashTableV2, HashTableV3, HashTableV4, HashTableV5
+from datastructures.heap.heap import Heap, NumericHeap
+from datastructures.profiling.profiling import Profiler, load_trace, replay
+
+
+def test_hashtable_calls_are_counted():
+    profiler = Profiler()
+    h = profiler.instrument(HashTableV5())
+
+    for i in range(100):
+        h[i] = i
+
+    assert h[5] == 5
+    assert isinstance(h, HashTableV5)
+
+    report = profiler.report()
+
+    assert report['__setitem__']['calls'] == 100
+    assert report['__getitem__']['calls'] == 1
+    assert report['_resize_container']['calls'] > 0
+    assert report['_find_position_for_key_and_hash']['calls'] >= 101
+    assert report['__setitem__']['total_time'] > 0
+
+
+def test_other_instances_are_not_affected():
+    profiler = Profiler()
+    profiler.instrument(HashTableV4())
+
+    h = HashTableV4()
+    h['a'] = 1
+
+    assert type(h) is HashTableV4
+    assert profiler.report() == {}
+
+
+def test_items_are_timed_while_consumed():
+    profiler = Profiler()
+    h = profiler.instrument(HashTableV3())
+    h['a'] = 1
+
+    items = h.items()
+    assert 'items' not in profiler.report()
+
+    assert list(items) == [('a', 1)]
+    assert profiler.report()['items']['calls'] == 1
+
+
+def test_heap_key_calls_are_counted():
+    profiler = Profiler()
+    h = profiler.instrument(Heap([3, 1, 2], key=lambda x: -x))
+
+    assert h.pop() == 1
+
+    report = profiler.report()
+    assert report['pop']['calls'] == 1
+    assert report['_reorder_heap_from_top']['calls'] == 1
+    assert report['key']['calls'] > 0
+
+
+def test_uninstrument():
+    key = lambda x: x
+    profiler = Profiler()
+    h = Heap([1, 2], key=key)
+
+    profiler.instrument(h)
+    profiler.uninstrument(h)
+
+    assert type(h) is Heap
+    assert h._key is key
+
+    with raises(ValueError):
+        profiler.uninstrument(h)
+
+
+def test_trace_ring_buffer():
+    profiler = Profiler(trace_sample_rate=1, trace_buffer_size=3)
+    h = profiler.instrument(HashTableV5())
+
+    h['a'] = 1
+    h['b'] = 2
+    h['a']
+    del h['b']
+
+    assert profiler.get_trace() == [
+        ('__setitem__', ('b', 2), {}),
+        ('__getitem__', ('a',), {}),
+        ('__delitem__', ('b',), {}),
+    ]
+
+
+def test_trace_sampling():
+    profiler = Profiler(trace_sample_rate=0.5, rng=random.Random(0))
+    h = profiler.instrument(HashTableV5())
+
+    for i in range(1000):
+        h[i] = i
+
+    assert 300 < len(profiler.get_trace()) < 700
+
+
+def test_dump_and_replay():
+    profiler = Profiler(trace_sample_rate=1)
+    h = profiler.instrument(NumericHeap())
+
+    h.push_many((i, str(i)) for i in range(50))
+    h.pop_many(10)
+    h.push(3.5, 'x')
+    h.pop()
+
+    f = io.BytesIO()
+    profiler.dump_trace(f)
+    f.seek(0)
+    trace = load_trace(f)
+
+    assert trace == profiler.get_trace()
+    assert trace[0] == ('push_many', ([(i, str(i)) for i in range(50)],), {})
+
+    replayed = NumericHeap()
+    results = replay(trace, {'numeric': lambda: replayed})
+
+    assert list(results) == ['numeric']
+    assert len(replayed) == 40
+
+
+def test_replay_tolerates_missing_keys():
+    trace = [('__delitem__', ('nope',)), ('__setitem__', ('a', 1)), ('__getitem__', ('a',))]
+
+    results = replay(trace, {'v4': HashTableV4, 'v5': HashTableV5, 'dict': dict}, repeat=2)
+
+    assert sorted(results) == ['dict', 'v4', 'v5']
+
+
+def test_nested_operations_are_traced_once():
+    profiler = Profiler(trace_sample_rate=1)
+    h = profiler.instrument(HashTableV2())
+
+    for i in range(20):
+        h[i] = i
+
+    # Growing re-inserts every entry through __setitem__
+    assert profiler.report()['__setitem__']['calls'] > 20
+    assert len(profiler.get_trace()) == 20
+
+
+def test_keyword_arguments_are_forwarded_and_traced():
+    profiler = Profiler(trace_sample_rate=1)
+    m = profiler.instrument(HashMultiset())
+
+    m.add('a', count=2)
+    m.add('b')
+
+    assert m['a'] == 2
+
+    h = profiler.instrument(NumericHeap())
+    h.push_many(pairs=iter([(1, 'x'), (2, 'y')]))
+
+    trace = profiler.get_trace()
+    assert trace[0] == ('add', ('a',), {'count': 2})
+    assert trace[-1] == ('push_many', (), {'pairs': [(1, 'x'), (2, 'y')]})
+
+    replayed = HashMultiset()
+    replay(trace[:2], {'multiset': lambda: replayed})
+    assert replayed['a'] == 2
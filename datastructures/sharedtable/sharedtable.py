@@ -0,0 +1,418 @@
+# coding: utf-8
+
+# Hash table living in a multiprocessing.shared_memory block, so that a pool of worker
+# processes can share one big table: the parent builds it once, and the children attach
+# to it by name, without pickling nor copying the contents.
+#
+# It works like HashTableV5 (open addressing with perturbed probing), but nothing in
+# the block can be a Python object, so the layout is:
+#
+#   | header | slots | arena |
+#
+# Each slot is a fixed-size struct with the state, key hash and where to find the key
+# and value, encoded as bytes, in the arena. The arena is only appended to: overwritten
+# values and deleted entries leave garbage behind.
+#
+# Keys and values can be bytes, str or int. Since hash() of str and bytes changes between
+# processes (PYTHONHASHSEED), keys are hashed with blake2b instead.
+#
+# The block cannot grow (attached processes would not notice), so capacity and arena
+# size are fixed on creation.
+#
+# Concurrency: a single writer can update the table while readers keep going, with a
+# seqlock. The writer makes the sequence counter odd while it modifies the table, and
+# even again once done. Readers retry their lookup if the counter was odd or changed
+# in the meantime.
+
+from __future__ import unicode_literals, absolute_import, division
+
+import struct
+import sys
+from hashlib import blake2b
+from multiprocessing import shared_memory
+
+
+# sequence, capacity, count, used slots, arena size, arena used
+_HEADER = struct.Struct('<QQQQQQ')
+
+# state, key type, value type, hash, key offset, key length, value offset, value length
+_SLOT = struct.Struct('<BBBxQQIQI')
+
+_FREE = 0
+_USED = 1
+_DELETED = 2
+
+_BYTES = 0
+_STR = 1
+_INT = 2
+
+_MIN_CAPACITY = 8
+
+
+class ArenaFullError(MemoryError):
+    """
+    There is no space left for keys and values in the shared memory block
+
+    """
+
+
+def _encode(obj):
+    """
+    Returns (type tag, bytes) for the given key or value
+
+    """
+    if isinstance(obj, bytes):
+        return _BYTES, obj
+
+    if isinstance(obj, str):
+        return _STR, obj.encode('utf-8')
+
+    if isinstance(obj, int):
+        return _INT, obj.to_bytes((obj.bit_length() + 8) // 8, 'little', signed=True)
+
+    raise TypeError('Only bytes, str and int are supported, got %r' % (type(obj),))
+
+
+def _decode(type_tag, data):
+    if type_tag == _BYTES:
+        return bytes(data)
+
+    if type_tag == _STR:
+        return bytes(data).decode('utf-8')
+
+    if type_tag == _INT:
+        return int.from_bytes(data, 'little', signed=True)
+
+    raise ValueError('Unknown type tag %r' % (type_tag,))
+
+
+def _hash(type_tag, data):
+    """
+    Hash that is the same in every process
+
+    """
+    digest = blake2b(data, digest_size=8, person=b'%d' % type_tag).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class _TornRead(Exception):
+    """
+    The writer changed the table while reading it
+
+    """
+
+
+class SharedHashTable(object):
+    """
+    HashTableV5-like table stored in shared memory, see module comments.
+
+    Build it with create() or from_items(), and attach to it from other processes with
+    attach(). Pickling an instance (e.g. sending it to a pool worker) just sends the name.
+
+    """
+
+    def __init__(self, shm, owner):
+        """
+        Use create(), from_items() or attach() instead
+
+        """
+        self._shm = shm
+        self._buf = shm.buf
+        self._owner = owner
+
+        capacity = self._read_header()[1]
+        self._capacity = capacity
+        self._slots_offset = _HEADER.size
+        self._arena_offset = _HEADER.size + capacity * _SLOT.size
+
+    @classmethod
+    def create(cls, capacity, arena_size, name=None):
+        """
+        :param capacity: Amount of entries to hold. The amount of slots will be bigger.
+        :param arena_size: Bytes available for the encoded keys and values
+        :param name: Name of the shared memory block. Random if not given.
+
+        """
+        # Slots are only filled up to 2/3, and there must be a power of 2 of them
+        slot_count = _MIN_CAPACITY
+
+        while capacity >= 2 * slot_count / 3:
+            slot_count *= 2
+
+        size = _HEADER.size + slot_count * _SLOT.size + max(arena_size, 1)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        # Zeroes are free slots
+        shm.buf[:_HEADER.size + slot_count * _SLOT.size] = bytes(_HEADER.size + slot_count * _SLOT.size)
+        _HEADER.pack_into(shm.buf, 0, 0, slot_count, 0, 0, max(arena_size, 1), 0)
+
+        return cls(shm, owner=True)
+
+    @classmethod
+    def from_items(cls, items, name=None):
+        """
+        Builds a table with exactly the space needed for the given (key, value) pairs
+        """
+        encoded = [(_encode(key), _encode(value)) for key, value in items]
+        arena_size = sum(len(key[1]) + len(value[1]) for key, value in encoded)
+
+        table = cls.create(len(encoded), arena_size, name=name)
+
+        for (key_tag, key_data), (value_tag, value_data) in encoded:
+            table._set_encoded(key_tag, key_data, value_tag, value_data)
+
+        return table
+
+    @classmethod
+    def attach(cls, name):
+        return cls(_attach_shared_memory(name), owner=False)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def __reduce__(self):
+        return attach, (self.name,)
+
+    def close(self):
+        """
+        Detaches from the shared memory block. The creator also destroys it.
+
+        """
+        self._buf = None
+        self._shm.close()
+
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Header and slots
+
+    def _read_header(self):
+        return _HEADER.unpack_from(self._buf, 0)
+
+    def _read_sequence(self):
+        return struct.unpack_from('<Q', self._buf, 0)[0]
+
+    def _write_header(self, sequence, count, used_slots, arena_used):
+        _, capacity, _, _, arena_size, _ = self._read_header()
+        _HEADER.pack_into(self._buf, 0, sequence, capacity, count, used_slots, arena_size, arena_used)
+
+    def _read_slot(self, pos):
+        return _SLOT.unpack_from(self._buf, self._slots_offset + pos * _SLOT.size)
+
+    def _write_slot(self, pos, *fields):
+        _SLOT.pack_into(self._buf, self._slots_offset + pos * _SLOT.size, *fields)
+
+    def _arena_view(self, offset, length):
+        start = self._arena_offset + offset
+        return self._buf[start:start + length]
+
+    def _find_position(self, key_tag, key_data, key_hash):
+        """
+        Same probing as HashTableV5._find_position_for_key_and_hash
+
+        """
+        capacity = self._capacity
+        first_seen_deleted = None
+        pos = key_hash % capacity
+        perturbation = key_hash
+
+        # Any sane probing ends way before this. Otherwise the writer is messing around.
+        for _ in range(capacity + 64):
+            state, stored_tag, _, stored_hash, key_offset, key_len, _, _ = self._read_slot(pos)
+
+            if state == _DELETED:
+                if first_seen_deleted is None:
+                    first_seen_deleted = pos
+
+            elif state == _FREE:
+                return pos if first_seen_deleted is None else first_seen_deleted
+
+            elif (
+                stored_hash == key_hash and
+                stored_tag == key_tag and
+                key_len == len(key_data) and
+                self._arena_view(key_offset, key_len) == key_data
+            ):
+                return pos
+
+            pos = (5 * pos + 1 + perturbation) % capacity
+            perturbation >>= 5
+
+        raise _TornRead()
+
+    # Reading
+
+    def _read(self, fn):
+        """
+        Runs fn() until it's done without the writer interfering (seqlock read side)
+
+        """
+        while True:
+            sequence = self._read_sequence()
+
+            if sequence & 1:
+                continue
+
+            try:
+                result = fn()
+
+            except (_TornRead, ValueError, UnicodeDecodeError, struct.error):
+                # Garbage read while the writer was busy, unless the sequence says otherwise
+                if self._read_sequence() == sequence:
+                    raise
+
+                continue
+
+            if self._read_sequence() == sequence:
+                return result
+
+    def _lookup(self, key_tag, key_data, key_hash):
+        """
+        Returns (found, value)
+
+        """
+        state, _, value_tag, _, _, _, value_offset, value_len = self._read_slot(
+            self._find_position(key_tag, key_data, key_hash)
+        )
+
+        if state != _USED:
+            return False, None
+
+        return True, _decode(value_tag, self._arena_view(value_offset, value_len))
+
+    def __getitem__(self, key):
+        key_tag, key_data = _encode(key)
+        key_hash = _hash(key_tag, key_data)
+
+        found, value = self._read(lambda: self._lookup(key_tag, key_data, key_hash))
+
+        if not found:
+            raise KeyError(key)
+
+        return value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            self[key]
+
+        except KeyError:
+            return False
+
+        return True
+
+    def __len__(self):
+        return self._read(lambda: self._read_header()[2])
+
+    def items(self):
+        """
+        Returns a list of (key, value) pairs, consistent with a single point in time
+
+        """
+        return self._read(self._read_all_items)
+
+    def _read_all_items(self):
+        pairs = []
+
+        for pos in range(self._capacity):
+            state, key_tag, value_tag, _, key_offset, key_len, value_offset, value_len = self._read_slot(pos)
+
+            if state == _USED:
+                pairs.append((
+                    _decode(key_tag, self._arena_view(key_offset, key_len)),
+                    _decode(value_tag, self._arena_view(value_offset, value_len)),
+                ))
+
+        return pairs
+
+    # Writing. Only one process can write at a time.
+
+    def __setitem__(self, key, value):
+        key_tag, key_data = _encode(key)
+        value_tag, value_data = _encode(value)
+
+        self._set_encoded(key_tag, key_data, value_tag, value_data)
+
+    def _set_encoded(self, key_tag, key_data, value_tag, value_data):
+        key_hash = _hash(key_tag, key_data)
+        sequence, capacity, count, used_slots, arena_size, arena_used = self._read_header()
+
+        pos = self._find_position(key_tag, key_data, key_hash)
+        state, _, _, _, key_offset, key_len, _, _ = self._read_slot(pos)
+
+        new_entry = state != _USED
+        needed = len(value_data) + (len(key_data) if new_entry else 0)
+
+        if arena_used + needed > arena_size:
+            raise ArenaFullError('No space left in the shared memory arena')
+
+        if new_entry and state == _FREE and used_slots + 1 > 2 * capacity / 3:
+            raise ArenaFullError('No free slots left in the shared memory table')
+
+        # Nobody can see the arena beyond arena_used, so no need to lock yet
+        if new_entry:
+            key_offset = arena_used
+            key_len = len(key_data)
+            self._arena_view(key_offset, key_len)[:] = key_data
+            arena_used += key_len
+
+        value_offset = arena_used
+        self._arena_view(value_offset, len(value_data))[:] = value_data
+        arena_used += len(value_data)
+
+        if new_entry:
+            count += 1
+
+            if state == _FREE:
+                used_slots += 1
+
+        self._write_header(sequence + 1, count, used_slots, arena_used)
+        self._write_slot(
+            pos, _USED, key_tag, value_tag, key_hash, key_offset, key_len, value_offset, len(value_data),
+        )
+        self._write_header(sequence + 2, count, used_slots, arena_used)
+
+    def __delitem__(self, key):
+        key_tag, key_data = _encode(key)
+        key_hash = _hash(key_tag, key_data)
+        sequence, _, count, used_slots, _, arena_used = self._read_header()
+
+        pos = self._find_position(key_tag, key_data, key_hash)
+
+        if self._read_slot(pos)[0] != _USED:
+            raise KeyError(key)
+
+        self._write_header(sequence + 1, count - 1, used_slots, arena_used)
+        self._write_slot(pos, _DELETED, 0, 0, 0, 0, 0, 0, 0)
+        self._write_header(sequence + 2, count - 1, used_slots, arena_used)
+
+
+def attach(name):
+    return SharedHashTable.attach(name)
+
+
+def _attach_shared_memory(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    shm = shared_memory.SharedMemory(name=name)
+
+    # Before 3.13, attaching registers the block in the resource tracker, which
+    # destroys it when this process exits, even if the creator is still using it
+    from multiprocessing import resource_tracker
+    resource_tracker.unregister(shm._name, 'shared_memory')
+
+    return shm
@@ -0,0 +1,137 @@
+# coding: utf-8
+
+import multiprocessing
+import pickle
+
+from pytest import raises, fixture
+
+from datastructures.sharedtable.sharedtable import SharedHashTable, ArenaFullError
+
+
+@fixture
+def table():
+    table = SharedHashTable.create(capacity=100, arena_size=10000)
+    yield table
+    table.close()
+
+
+def test_basic(table):
+    table['a'] = 'hello'
+    table[b'a'] = b'bytes'
+    table[42] = -7
+
+    assert table['a'] == 'hello'
+    assert table[b'a'] == b'bytes'
+    assert table[42] == -7
+    assert len(table) == 3
+
+    table['a'] = 'bye'
+    assert table['a'] == 'bye'
+    assert len(table) == 3
+
+    del table['a']
+
+    with raises(KeyError):
+        table['a']
+
+    with raises(KeyError):
+        del table['a']
+
+    assert 'a' not in table
+    assert 42 in table
+    assert table.get('a', 'default') == 'default'
+    assert sorted(table.items(), key=repr) == [(42, -7), (b'a', b'bytes')]
+
+
+def test_unsupported_types(table):
+    with raises(TypeError):
+        table[1.5] = 'x'
+
+    with raises(TypeError):
+        table['x'] = [1]
+
+
+def test_limits():
+    with SharedHashTable.create(capacity=10, arena_size=10) as table:
+        with raises(ArenaFullError):
+            table['key'] = 'too long for the arena'
+
+        table['k'] = 'v'
+        assert len(table) == 1
+
+    with SharedHashTable.create(capacity=3, arena_size=1000) as table:
+        with raises(ArenaFullError):
+            for i in range(100):
+                table[i] = i
+
+
+def test_from_items():
+    items = {'key-%s' % i: i * 1000 for i in range(1000)}
+
+    with SharedHashTable.from_items(items.items()) as table:
+        assert dict(table.items()) == items
+
+
+def test_attach_sees_writes(table):
+    attached = SharedHashTable.attach(table.name)
+
+    table['a'] = 1
+    assert attached['a'] == 1
+
+    attached.close()
+    assert table['a'] == 1
+
+
+def test_pickling_sends_only_the_name(table):
+    table['a'] = 1
+
+    assert len(pickle.dumps(table)) < 200
+    assert pickle.loads(pickle.dumps(table))['a'] == 1
+
+
+def _lookup(args):
+    table, key = args
+    return table.get(key)
+
+
+def test_pool_workers(table):
+    for i in range(50):
+        table['key-%s' % i] = i
+
+    with multiprocessing.Pool(2) as pool:
+        results = pool.map(_lookup, [(table, 'key-%s' % i) for i in range(60)])
+
+    assert results == list(range(50)) + [None] * 10
+
+
+def _read_while_writing(name, rounds, queue):
+    table = SharedHashTable.attach(name)
+    seen = set()
+
+    for _ in range(rounds):
+        value = table['key']
+
+        # Both halves are always written together
+        assert value[:100] == value[100:]
+        seen.add(value[:1])
+
+    table.close()
+    queue.put(sorted(seen))
+
+
+def test_readers_never_see_half_writes():
+    # Every write appends to the arena, make room for all of them
+    with SharedHashTable.create(capacity=10, arena_size=10 ** 6) as table:
+        table['key'] = b'a' * 200
+
+        queue = multiprocessing.Queue()
+        reader = multiprocessing.Process(target=_read_while_writing, args=(table.name, 2000, queue))
+        reader.start()
+
+        for i in range(4000):
+            table['key'] = (b'a' if i % 2 else b'b') * 200
+
+        reader.join(30)
+
+        assert reader.exitcode == 0
+        assert queue.get(timeout=1)
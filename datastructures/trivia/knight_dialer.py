@@ -0,0 +1,326 @@
+# coding: utf-8
+
+# Extracted from:
+# https://hackernoon.com/google-interview-questions-deconstructed-the-knights-dialer-f780d516f029
+
+# Problem:
+# Imagine a telephone dialer like this:
+#
+#       1  2  3
+#       4  5  6
+#       7  8  9
+#          0
+#
+# And a knight chess piece is placed on a given number, being able to move only in L shape.
+#
+# Given an starting number and a number of hops, count how many possible combinations of
+# numbers is it possible to create.
+
+from __future__ import unicode_literals, print_function
+
+from functools import partial
+from timeit import default_timer as timer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+edges = {
+    1: [6, 8],
+    2: [7, 9],
+    3: [4, 8],
+    4: [3, 9, 0],
+    5: [],
+    6: [1, 7, 0],
+    7: [2, 6],
+    8: [1, 3],
+    9: [4, 2],
+    0: [4, 6],
+}
+
+
+def sol_1(number, hops):
+    # Generate each possible solution and then count them.
+    # This is about O(n^2) in time since each extra hop kind of doubles
+    # the recursion calls.
+
+    # N N -> [[N]]
+    def yield_solutions(number, hops):
+        if not hops:
+            yield [number]
+
+        else:
+            for next_number in edges[number]:
+                for subsolution in yield_solutions(next_number, hops - 1):
+                    yield [number] + subsolution
+
+    return sum(1 for _ in yield_solutions(number, hops))
+
+
+def sol_2(number, hops):
+    # Don't generate solutions, just count them
+    if not hops:
+        return 1
+
+    return sum(
+        sol_2(next_number, hops - 1)
+        for next_number in edges[number]
+    )
+
+
+def sol_3(number, hops):
+    # Memoize to avoid repeated function calls.
+    # Linear in time and space, although the stack may overflow.
+
+    cache = {}
+
+    def do_it(number, hops):
+        if not hops:
+            return 1
+
+        call_args = number, hops
+
+        if call_args not in cache:
+            res = sum(
+                do_it(next_number, hops - 1)
+                for next_number in edges[number]
+            )
+
+            cache[call_args] = res
+
+        return cache[call_args]
+
+    return do_it(number, hops)
+
+
+def sol_4(number, hops, mod=None):
+    # If you draw the recursion call tree, you get an extra layer for
+    # each hop until you hit the zero-hops layers, where no more calls are needed,
+    # and concrete numbers can be generated the edge case).
+    #
+    # With this approach the tree is built from bottom up, i.e. start with
+    # the 0-hops-layer for all possible number inputs [0.. 9] (which is a list full of 1's),
+    # and then knowing that the combination count of a number is the sum of the counts of
+    # the numbers that land onto that initial number, we can build the 1-hops-layer.
+    # Then rinse and repeat up to the desired layer. In other words the N-layer is
+    # induced from the (N-1)-layer.
+    #
+    # This is constant in space and linear in time, and there is no risk of
+    # stack overflow.
+    #
+    # Counts grow linearly in digits with the hops, and so does the cost of each
+    # addition. If only the count modulo some number is needed, passing `mod` keeps
+    # every number small and each hop costs the same.
+
+    NUMBER_COUNT = 10
+
+    # Zero layer. If no hops, the count of combinations for each starting number is 1
+    sol = [1 if mod is None else 1 % mod] * NUMBER_COUNT
+
+    for _ in range(hops):
+        prev = sol.copy()
+
+        for idx in range(NUMBER_COUNT):
+            # The number of combinations starting from this number
+            # is equal to the sum of combination that can jump onto
+            # this number
+            sol[idx] = sum(prev[source] for source in edges[idx])
+
+            if mod is not None:
+                sol[idx] %= mod
+
+    return sol[number]
+
+
+def sol_5(number, hops, mod=None):
+    # The layer step of sol_4 is a linear transformation: the new layer is the
+    # adjacency matrix of the graph times the previous layer. Doing N hops is then
+    # multiplying by the matrix N times, i.e. by the matrix raised to the N-th power,
+    # and that power can be calculated with O(log N) multiplications by repeated squaring.
+    #
+    # Counts become huge, so the multiplications are big-int ones and get slower as
+    # the numbers grow, but even millions of hops are feasible.
+
+    return sol_5_all(hops, mod)[number]
+
+
+NUMBER_COUNT = 10
+
+# M[i][j] is 1 if the knight can jump from i to j
+adjacency = [
+    [1 if target in edges[source] else 0 for target in range(NUMBER_COUNT)]
+    for source in range(NUMBER_COUNT)
+]
+
+
+def sol_5_all(hops, mod=None):
+    """
+    Returns a list with the count of combinations for each starting number
+
+    """
+    if hops < 0:
+        raise ValueError('hops must be non-negative, got %r' % (hops,))
+
+    matrix = adjacency
+
+    # Zero layer
+    sol = [1 if mod is None else 1 % mod] * NUMBER_COUNT
+
+    # Powers of the same matrix commute, so instead of building the full power
+    # and then multiplying by the zero layer, the layer is multiplied by each
+    # squared matrix whose bit is set in the hops count. Matrix-vector products are
+    # way cheaper than matrix-matrix ones.
+    while hops:
+        if hops & 1:
+            sol = _matrix_vector_multiply(matrix, sol, mod)
+
+        hops >>= 1
+
+        if hops:
+            matrix = _matrix_multiply(matrix, matrix, mod)
+
+    return sol
+
+
+def _matrix_vector_multiply(matrix, vector, mod=None):
+    result = [sum(x * y for x, y in zip(row, vector)) for row in matrix]
+
+    if mod is not None:
+        result = [value % mod for value in result]
+
+    return result
+
+
+def _matrix_multiply(a, b, mod=None):
+    b_columns = list(zip(*b))
+
+    return [
+        _matrix_vector_multiply(b_columns, row, mod)
+        for row in a
+    ]
+
+
+# Gaps between queries of at least this many hops are jumped with matrix powers
+# instead of doing them one by one. A hop is ~20 additions, a matrix product 1000
+# multiplications, and a gap of N hops needs about log2(N) of them.
+_BATCH_MATRIX_POWER_MIN_GAP = 1024
+
+# With NumPy, layers are calculated with int64 as long as no sum can overflow.
+# At most 3 numbers are added per hop.
+_NUMPY_MAX_MOD = 2 ** 61
+
+
+def batch_counts(queries, mod=None):
+    """
+    Answers many (number, hops) queries at once, returning the counts in the same order.
+
+    Queries are sorted by hops, so that a single forward sweep of layers, as in sol_4,
+    serves all of them. Big gaps between consecutive hop counts are jumped with the
+    matrix powers of sol_5, which are calculated once and reused for every gap.
+
+    """
+    queries = list(queries)
+    results = [None] * len(queries)
+
+    use_numpy = numpy is not None and mod is not None and mod <= _NUMPY_MAX_MOD
+
+    if use_numpy:
+        numpy_adjacency = numpy.array(adjacency, dtype=numpy.int64)
+
+    # squared_matrices[k] is the adjacency matrix raised to 2^k
+    squared_matrices = [adjacency]
+
+    sol = [1 if mod is None else 1 % mod] * NUMBER_COUNT
+    current_hops = 0
+
+    for query_idx in sorted(range(len(queries)), key=lambda idx: queries[idx][1]):
+        number, hops = queries[query_idx]
+        gap = hops - current_hops
+
+        if gap >= _BATCH_MATRIX_POWER_MIN_GAP:
+            for bit in range(gap.bit_length()):
+                if bit == len(squared_matrices):
+                    squared_matrices.append(
+                        _matrix_multiply(squared_matrices[-1], squared_matrices[-1], mod)
+                    )
+
+                if gap >> bit & 1:
+                    sol = _matrix_vector_multiply(squared_matrices[bit], sol, mod)
+
+        elif use_numpy:
+            layer = numpy.array(sol, dtype=numpy.int64)
+
+            for _ in range(gap):
+                layer = numpy_adjacency.dot(layer) % mod
+
+            sol = [int(value) for value in layer]
+
+        else:
+            for _ in range(gap):
+                sol = [sum(sol[target] for target in edges[idx]) for idx in range(NUMBER_COUNT)]
+
+                if mod is not None:
+                    sol = [value % mod for value in sol]
+
+        current_hops = hops
+        results[query_idx] = sol[number]
+
+    return results
+
+
+def _get_name(fn):
+    if isinstance(fn, partial):
+        return '%s(%s)' % (
+            _get_name(fn.func),
+            ', '.join('%s=%s' % pair for pair in sorted(fn.keywords.items())),
+        )
+
+    return fn.__name__
+
+
+def test(fn, hops=18, verbose=True):
+    """
+    Times fn for the given hops. Returns a tuple (result, elapsed seconds)
+
+    """
+    start = timer()
+    res = fn(1, hops)
+    elapsed = timer() - start
+
+    if verbose:
+        print('Function: %s, hops: %s, returned: %s, elapsed: %s secs' % (
+            _get_name(fn), hops, res, elapsed,
+        ))
+
+    return res, elapsed
+
+
+def compare(fns, hop_counts):
+    """
+    Runs every function for every hop count, and checks all of them agree
+
+    """
+    for hops in hop_counts:
+        results = {_get_name(fn): test(fn, hops)[0] for fn in fns}
+
+        if len(set(results.values())) != 1:
+            raise AssertionError('Solutions disagree for %s hops: %s' % (hops, results))
+
+
+if __name__ == '__main__':
+    # Naive solutions only for small hop counts, they blow up quickly
+    compare([sol_1, sol_2, sol_3, sol_4, sol_5], [0, 1, 2, 10, 18])
+    compare([sol_3, sol_4, sol_5], [100, 200])
+    compare([sol_4, sol_5], [1000, 5000])
+
+    mod = 10 ** 9 + 7
+    compare([partial(sol_4, mod=mod), partial(sol_5, mod=mod)], [10 ** 5])
+
+    start = timer()
+    queries = [(number, hops) for hops in range(0, 10 ** 5, 997) for number in range(NUMBER_COUNT)]
+    res = batch_counts(queries, mod=mod)
+    print('Function: batch_counts, queries: %s, elapsed: %s secs' % (len(queries), timer() - start))
+
+    if res != [sol_5(number, hops, mod=mod) for number, hops in queries]:
+        raise AssertionError('batch_counts disagrees with sol_5')
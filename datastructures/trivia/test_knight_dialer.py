@@ -0,0 +1,65 @@
+# coding: utf-8
+
+from pytest import raises, importorskip
+
+from datastructures.trivia import knight_dialer
+from datastructures.trivia.knight_dialer import sol_4, sol_5, sol_5_all
+
+
+def test_sol_5_matches_sol_4():
+    for hops in [0, 1, 2, 10, 100]:
+        for number in range(10):
+            assert sol_5(number, hops) == sol_4(number, hops)
+
+
+def test_sol_5_rejects_negative_hops():
+    with raises(ValueError):
+        sol_5_all(-1)
+
+    with raises(ValueError):
+        sol_5(1, -5, mod=7)
+
+
+def test_mod_matches_plain_counts():
+    mod = 10 ** 9 + 7
+
+    for hops in [0, 1, 50, 300]:
+        for number in range(10):
+            expected = sol_4(number, hops) % mod
+            assert sol_4(number, hops, mod=mod) == expected
+            assert sol_5(number, hops, mod=mod) == expected
+
+
+# Unsorted, with repeats, and with gaps both below and above the matrix power threshold
+BATCH_QUERIES = [
+    (number, hops)
+    for hops in [1500, 0, 7, 7, 1023, 300, 3000, 4100]
+    for number in [1, 4, 5, 0]
+]
+
+
+def _test_batch_counts(numpy_module, monkeypatch, mod):
+    monkeypatch.setattr(knight_dialer, 'numpy', numpy_module)
+
+    assert knight_dialer.batch_counts(BATCH_QUERIES, mod=mod) == [
+        sol_5(number, hops, mod=mod) for number, hops in BATCH_QUERIES
+    ]
+
+
+def test_batch_counts_without_numpy(monkeypatch):
+    _test_batch_counts(None, monkeypatch, None)
+    _test_batch_counts(None, monkeypatch, 10 ** 9 + 7)
+
+
+def test_batch_counts_with_numpy(monkeypatch):
+    numpy = importorskip('numpy')
+    _test_batch_counts(numpy, monkeypatch, 10 ** 9 + 7)
+
+    # Too big a modulo for int64, falls back to big ints
+    _test_batch_counts(numpy, monkeypatch, 2 ** 64 + 13)
+
+
+def test_batch_counts_small_queries_match_sol_4():
+    queries = [(number, hops) for hops in range(20) for number in range(10)]
+
+    assert knight_dialer.batch_counts(queries) == [sol_4(number, hops) for number, hops in queries]
@@ -0,0 +1,8 @@
+# coding: utf-8
+
+from .walks import (
+    Board, Piece, MoveGraph,
+    KNIGHT, KING, BISHOP, ROOK, QUEEN, PHONE_KEYPAD,
+    count_walks, count_all_walks, choose_strategy,
+    iter_walks, walk_at, sample_walks, shard_prefixes, map_shards,
+)
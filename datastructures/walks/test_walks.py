@@ -0,0 +1,269 @@
+# coding: utf-8
+
+import multiprocessing
+import random
+
+from pytest import raises, importorskip
+
+from datastructures.walks import walks
+from datastructures.walks.walks import (
+    Board, MoveGraph, Piece, KNIGHT, KING, BISHOP, ROOK, PHONE_KEYPAD,
+    count_walks, count_all_walks, choose_strategy,
+    iter_walks, walk_at, sample_walks, shard_prefixes, map_shards,
+)
+
+
+knight_dialer_edges = {
+    '1': ['6', '8'],
+    '2': ['7', '9'],
+    '3': ['4', '8'],
+    '4': ['3', '9', '0'],
+    '5': [],
+    '6': ['1', '7', '0'],
+    '7': ['2', '6'],
+    '8': ['1', '3'],
+    '9': ['4', '2'],
+    '0': ['4', '6'],
+}
+
+
+def _sorted_edges(graph):
+    return {label: sorted(targets) for label, targets in graph.edges().items()}
+
+
+def test_knight_on_phone_keypad():
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+
+    assert _sorted_edges(graph) == _sorted_edges(MoveGraph(knight_dialer_edges))
+    assert graph.is_symmetric()
+
+
+def test_grid_with_holes():
+    board = Board.grid(3, 3, holes=[(1, 1)])
+
+    assert (1, 1) not in board
+    assert len(board.positions()) == 8
+
+    # The king in a corner can't go to the center
+    graph = MoveGraph.from_board(board, KING)
+    assert sorted(graph.edges()[(0, 0)]) == [(0, 1), (1, 0)]
+
+
+def test_rays_stop_at_holes():
+    board = Board.from_rows([
+        'abc',
+        'd f',
+        'ghi',
+    ])
+
+    assert sorted(MoveGraph.from_board(board, ROOK).edges()['b']) == ['a', 'c']
+    assert sorted(MoveGraph.from_board(board, BISHOP).edges()['a']) == []
+    assert sorted(MoveGraph.from_board(board, BISHOP).edges()['d']) == ['b', 'h']
+
+
+def test_custom_piece_is_not_symmetric():
+    pawn = Piece(offsets=[(-1, 0)])
+    graph = MoveGraph.from_board(Board.grid(3, 1), pawn)
+
+    assert not graph.is_symmetric()
+    assert count_all_walks(graph, 2) == {(0, 0): 0, (1, 0): 0, (2, 0): 1}
+
+
+def test_strategies_agree():
+    graphs = [
+        MoveGraph.from_board(PHONE_KEYPAD, KNIGHT),
+        MoveGraph.from_board(Board.grid(4, 5, holes=[(2, 2), (0, 4)]), KING),
+        MoveGraph.from_board(Board.grid(4, 4), BISHOP),
+        MoveGraph.from_board(Board.grid(3, 1), Piece(offsets=[(-1, 0), (2, 0)])),
+    ]
+
+    for graph in graphs:
+        for length in [0, 1, 2, 7, 30]:
+            assert (
+                count_all_walks(graph, length, 'layers') ==
+                count_all_walks(graph, length, 'matrix_power') ==
+                count_all_walks(graph, length)
+            )
+
+
+def test_knight_dialer_counts():
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+
+    assert count_walks(graph, '1', 0) == 1
+    assert count_walks(graph, '1', 2) == 5
+    assert count_walks(graph, '1', 18) == 2802176
+    assert count_walks(graph, '5', 10) == 0
+
+
+def test_choose_strategy(monkeypatch):
+    monkeypatch.setattr(walks, 'numpy', None)
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+
+    assert choose_strategy(graph, 3) == 'layers'
+    assert choose_strategy(graph, 10 ** 6) == 'matrix_power'
+
+
+def test_choose_strategy_with_numpy():
+    importorskip('numpy')
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+
+    # Small enough counts for floats, NumPy wins
+    assert choose_strategy(graph, 3) == 'eigen'
+
+    # Counts too big to be exact with floats
+    assert choose_strategy(graph, 10 ** 6) == 'matrix_power'
+
+
+def test_invalid_arguments():
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+
+    with raises(ValueError):
+        count_walks(graph, '1', -1)
+
+    with raises(ValueError):
+        count_walks(graph, '1', 3, strategy='guessing')
+
+
+def test_eigen_strategy_without_numpy(monkeypatch):
+    monkeypatch.setattr(walks, 'numpy', None)
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+
+    assert choose_strategy(graph, 5) != 'eigen'
+
+    with raises(RuntimeError):
+        count_walks(graph, '1', 3, strategy='eigen')
+
+
+def test_eigen_strategy():
+    importorskip('numpy')
+    graph = MoveGraph.from_board(Board.grid(5, 5), KING)
+
+    for length in [0, 1, 5, 12]:
+        assert count_all_walks(graph, length, 'eigen') == count_all_walks(graph, length, 'layers')
+
+    with raises(ValueError):
+        count_all_walks(graph, 100, 'eigen')
+
+
+def _yield_walks_recursively(edges, start, length):
+    if not length:
+        yield (start,)
+        return
+
+    for target in edges[start]:
+        for walk in _yield_walks_recursively(edges, target, length - 1):
+            yield (start,) + walk
+
+
+def test_iter_walks_matches_recursive_enumeration():
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+    edges = graph.edges()
+
+    for start in graph.labels:
+        for length in [0, 1, 2, 6]:
+            assert list(iter_walks(graph, start, length)) == list(_yield_walks_recursively(edges, start, length))
+
+
+def test_iter_walks_is_not_recursive():
+    graph = MoveGraph({'a': ['b'], 'b': ['a']})
+
+    assert list(iter_walks(graph, 'a', 5000)) == [('a', 'b') * 2500 + ('a',)]
+
+
+def test_iter_walks_skip_and_limit():
+    graph = MoveGraph.from_board(Board.grid(3, 3, holes=[(0, 2)]), KING)
+    start = (1, 1)
+    all_walks = list(iter_walks(graph, start, 4))
+
+    assert len(all_walks) == count_walks(graph, start, 4)
+
+    for skip in [0, 1, 7, 100, len(all_walks) - 1, len(all_walks), len(all_walks) + 3]:
+        for limit in [None, 0, 1, 13]:
+            expected = all_walks[skip:None if limit is None else skip + limit]
+            assert list(iter_walks(graph, start, 4, skip=skip, limit=limit)) == expected
+
+    for idx in [0, 5, len(all_walks) - 1]:
+        assert walk_at(graph, start, 4, idx) == all_walks[idx]
+
+    with raises(IndexError):
+        walk_at(graph, start, 4, len(all_walks))
+
+    with raises(IndexError):
+        walk_at(graph, start, 4, -1)
+
+
+def test_iter_walks_skips_dead_ends():
+    graph = MoveGraph({'a': ['b', 'c', 'b'], 'b': [], 'c': ['a']})
+
+    assert list(iter_walks(graph, 'a', 2)) == [('a', 'c', 'a')]
+    assert list(iter_walks(graph, 'a', 2, skip=1)) == []
+
+
+def test_iter_walks_with_prefix():
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+    all_walks = list(iter_walks(graph, '4', 5))
+
+    with_prefix = list(iter_walks(graph, '4', 5, prefix=('4', '9')))
+    assert with_prefix == [walk for walk in all_walks if walk[:2] == ('4', '9')]
+
+    with raises(ValueError):
+        list(iter_walks(graph, '4', 5, prefix=('4', '5')))
+
+    with raises(ValueError):
+        list(iter_walks(graph, '4', 5, prefix=('1',)))
+
+
+def test_sample_walks():
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+    all_walks = set(iter_walks(graph, '1', 4))
+
+    samples = sample_walks(graph, '1', 4, 50, rng=random.Random(7))
+
+    assert len(samples) == 50
+    assert set(samples) <= all_walks
+
+    with raises(ValueError):
+        sample_walks(graph, '5', 4, 1)
+
+
+def test_sample_walks_counts_once(monkeypatch):
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+    calls = []
+    count_layers = walks._count_layers
+
+    def counting_count_layers(*args):
+        calls.append(args)
+        return count_layers(*args)
+
+    monkeypatch.setattr(walks, '_count_layers', counting_count_layers)
+
+    samples = sample_walks(graph, '1', 200, 100, rng=random.Random(3))
+
+    assert len(calls) == 1
+    assert len(set(samples)) == 100
+    assert all(len(walk) == 201 and walk[0] == '1' for walk in samples)
+
+
+def test_shard_prefixes():
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+
+    assert sorted(shard_prefixes(graph, '4', 5, 1)) == [('4', '0'), ('4', '3'), ('4', '9')]
+    assert sorted(shard_prefixes(graph, '4', 1, 3)) == [('4', '0'), ('4', '3'), ('4', '9')]
+
+    # b is a dead end
+    graph = MoveGraph({'a': ['b', 'c'], 'b': [], 'c': ['a']})
+    assert shard_prefixes(graph, 'a', 3) == [('a', 'c')]
+
+
+def _count(walks_iterator):
+    return sum(1 for _ in walks_iterator)
+
+
+def test_map_shards():
+    graph = MoveGraph.from_board(PHONE_KEYPAD, KNIGHT)
+
+    with multiprocessing.Pool(2) as pool:
+        counts = list(map_shards(pool, _count, graph, '1', 10, shard_length=2))
+
+    assert len(counts) == len(shard_prefixes(graph, '1', 10, 2))
+    assert sum(counts) == count_walks(graph, '1', 10)
@@ -0,0 +1,595 @@
+# coding: utf-8
+
+# Generalization of the knight dialer (see trivia/knight_dialer.py): count how many walks
+# of a given length a piece can do on a board, for any board layout and any piece.
+#
+# The board is turned into a move graph, and then the walks are counted with one of
+# these strategies:
+#
+#   - 'layers': the bottom-up DP of sol_4. O(length * edges) big-int additions.
+#   - 'matrix_power': the adjacency matrix raised to the length-th power by repeated
+#     squaring. O(log(length) * nodes^3) big-int multiplications.
+#   - 'eigen': eigendecomposition of the (symmetric) adjacency matrix with NumPy.
+#     Only exact while the counts fit in a float's mantissa, and only available for
+#     graphs where every move can be undone.
+#
+# Unless told otherwise, the cheapest applicable strategy is picked automatically.
+
+from __future__ import unicode_literals, absolute_import, division
+
+import math
+import random
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Board(object):
+    """
+    Set of cells identified by their (row, column) position, each one with a label
+
+    """
+
+    def __init__(self, cells):
+        """
+        :param cells: dict of (row, column) -> label. Positions not present are holes.
+
+        """
+        self._cells = dict(cells)
+
+    # Character used in from_rows() for cells that don't exist
+    HOLE = ' '
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds a board out of a drawing, where every character is the label of a cell,
+        e.g. ['123', '456', '789', ' 0 '] is a phone keypad.
+
+        """
+        return cls({
+            (row_idx, col_idx): label
+            for row_idx, row in enumerate(rows)
+            for col_idx, label in enumerate(row)
+            if label != cls.HOLE
+        })
+
+    @classmethod
+    def grid(cls, rows, columns, holes=()):
+        """
+        Builds a rows x columns board whose labels are the (row, column) positions
+
+        """
+        holes = set(holes)
+
+        return cls({
+            (row, col): (row, col)
+            for row in range(rows)
+            for col in range(columns)
+            if (row, col) not in holes
+        })
+
+    def __contains__(self, position):
+        return position in self._cells
+
+    def label_at(self, position):
+        return self._cells[position]
+
+    def positions(self):
+        return sorted(self._cells)
+
+
+class Piece(object):
+    """
+    Movement rule of a piece, made of jumps and rays.
+
+    Jumps (offsets) land directly on the target cell, like a knight. Rays slide one
+    step at a time in a direction, like a bishop, and are stopped by holes and the
+    borders of the board.
+
+    """
+
+    def __init__(self, offsets=(), rays=()):
+        self.offsets = tuple(offsets)
+        self.rays = tuple(rays)
+
+    def moves(self, board, position):
+        """
+        Yields the positions the piece can go to from the given one
+
+        """
+        row, col = position
+
+        for row_offset, col_offset in self.offsets:
+            target = row + row_offset, col + col_offset
+
+            if target in board:
+                yield target
+
+        for row_step, col_step in self.rays:
+            target = row + row_step, col + col_step
+
+            while target in board:
+                yield target
+                target = target[0] + row_step, target[1] + col_step
+
+
+_DIAGONALS = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
+_STRAIGHTS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+KNIGHT = Piece(offsets=[
+    (1, 2), (2, 1), (2, -1), (1, -2),
+    (-1, -2), (-2, -1), (-2, 1), (-1, 2),
+])
+KING = Piece(offsets=_DIAGONALS + _STRAIGHTS)
+BISHOP = Piece(rays=_DIAGONALS)
+ROOK = Piece(rays=_STRAIGHTS)
+QUEEN = Piece(rays=_DIAGONALS + _STRAIGHTS)
+
+PHONE_KEYPAD = Board.from_rows([
+    '123',
+    '456',
+    '789',
+    ' 0 ',
+])
+
+
+class MoveGraph(object):
+    """
+    Directed graph of the moves a piece can do. Nodes are the cell labels.
+
+    """
+
+    def __init__(self, edges):
+        """
+        :param edges: dict of label -> iterable of labels that can be reached from it,
+            just like `edges` in the knight dialer.
+
+        """
+        self._labels = list(edges)
+        self._index = {label: idx for idx, label in enumerate(self._labels)}
+
+        # Same as edges, but with node indices instead of labels
+        self._adjacency = [
+            [self._index[target] for target in edges[label]]
+            for label in self._labels
+        ]
+
+    @classmethod
+    def from_board(cls, board, piece):
+        return cls({
+            board.label_at(position): [
+                board.label_at(target) for target in piece.moves(board, position)
+            ]
+            for position in board.positions()
+        })
+
+    @property
+    def labels(self):
+        return list(self._labels)
+
+    def edges(self):
+        return {
+            label: [self._labels[target] for target in targets]
+            for label, targets in zip(self._labels, self._adjacency)
+        }
+
+    def edge_count(self):
+        return sum(map(len, self._adjacency))
+
+    def max_degree(self):
+        return max(map(len, self._adjacency)) if self._adjacency else 0
+
+    def is_symmetric(self):
+        """
+        Returns whether every move can be undone, i.e. the graph is undirected
+
+        """
+        edge_counts = {}
+
+        for source, targets in enumerate(self._adjacency):
+            for target in targets:
+                edge_counts[source, target] = edge_counts.get((source, target), 0) + 1
+
+        return all(
+            edge_counts.get((target, source)) == count
+            for (source, target), count in edge_counts.items()
+        )
+
+    def adjacency_matrix(self):
+        """
+        Returns M as a list of lists, where M[i][j] is the amount of moves from node i to j
+
+        """
+        size = len(self._labels)
+        matrix = [[0] * size for _ in range(size)]
+
+        for source, targets in enumerate(self._adjacency):
+            for target in targets:
+                matrix[source][target] += 1
+
+        return matrix
+
+    def __len__(self):
+        return len(self._labels)
+
+
+def count_walks(graph, start, length, strategy=None):
+    """
+    Returns how many walks of `length` moves start at the node labeled `start`
+
+    """
+    return count_all_walks(graph, length, strategy)[start]
+
+
+def count_all_walks(graph, length, strategy=None):
+    """
+    Returns a dict label -> amount of walks of `length` moves starting at that node
+
+    :param strategy: One of 'layers', 'matrix_power' or 'eigen'. If not given, it is
+        picked by choose_strategy().
+
+    """
+    if length < 0:
+        raise ValueError('Walk length cannot be negative')
+
+    if strategy is None:
+        strategy = choose_strategy(graph, length)
+
+    try:
+        solver = _STRATEGIES[strategy]
+
+    except KeyError:
+        raise ValueError('Unknown strategy %r' % (strategy,))
+
+    return dict(zip(graph.labels, solver(graph, length)))
+
+
+# Rough amount of Python-level operations that NumPy does in the time of one
+_NUMPY_SPEEDUP = 100
+
+# Counts must stay below this to be exactly representable after the float error
+# of the eigendecomposition
+_EIGEN_MAX_COUNT = 2 ** 48
+
+
+def choose_strategy(graph, length):
+    """
+    Returns the name of the cheapest strategy for the given graph and walk length,
+    based on a rough operation count of each one
+
+    """
+    size = len(graph)
+    costs = {
+        'layers': length * graph.edge_count(),
+        'matrix_power': size ** 3 * length.bit_length(),
+    }
+
+    if _eigen_is_exact(graph, length):
+        costs['eigen'] = size ** 3 // _NUMPY_SPEEDUP
+
+    return min(sorted(costs), key=costs.get)
+
+
+def _eigen_is_exact(graph, length):
+    if numpy is None or not graph.is_symmetric():
+        return False
+
+    # The max degree bounds the biggest eigenvalue, so this bounds every count
+    max_degree = graph.max_degree()
+
+    if max_degree <= 1:
+        return True
+
+    bound_bits = length * math.log(max_degree, 2) + math.log(len(graph), 2)
+
+    return bound_bits < math.log(_EIGEN_MAX_COUNT, 2)
+
+
+def _count_with_layers(graph, length):
+    # Zero layer. If no moves, the count of walks for each starting node is 1
+    sol = [1] * len(graph)
+
+    for _ in range(length):
+        prev = sol
+        sol = [sum(prev[target] for target in targets) for targets in graph._adjacency]
+
+    return sol
+
+
+def _count_with_matrix_power(graph, length):
+    matrix = graph.adjacency_matrix()
+    sol = [1] * len(graph)
+
+    # Same trick as the knight dialer's sol_5: powers of the same matrix commute, so
+    # the zero layer gets multiplied by every squared matrix whose bit is set
+    while length:
+        if length & 1:
+            sol = [sum(x * y for x, y in zip(row, sol)) for row in matrix]
+
+        length >>= 1
+
+        if length:
+            matrix = _matrix_multiply(matrix, matrix)
+
+    return sol
+
+
+def _matrix_multiply(a, b):
+    size = len(b[0])
+    result = []
+
+    # Boards make sparse matrices, so the zeros of `a` are skipped
+    for row in a:
+        result_row = [0] * size
+
+        for a_value, b_row in zip(row, b):
+            if not a_value:
+                continue
+
+            for col_idx, b_value in enumerate(b_row):
+                if b_value:
+                    result_row[col_idx] += a_value * b_value
+
+        result.append(result_row)
+
+    return result
+
+
+def _count_with_eigen(graph, length):
+    if numpy is None:
+        raise RuntimeError('The eigen strategy requires NumPy')
+
+    if not graph.is_symmetric():
+        raise ValueError('The eigen strategy requires every move to be reversible')
+
+    if not _eigen_is_exact(graph, length):
+        raise ValueError('Counts are too big to be calculated exactly with floats')
+
+    # M = Q diag(w) Q^T, so M^n 1 = Q diag(w^n) Q^T 1
+    eigenvalues, eigenvectors = numpy.linalg.eigh(numpy.array(graph.adjacency_matrix(), dtype='d'))
+    ones = numpy.ones(len(graph))
+    counts = eigenvectors.dot(eigenvalues ** length * eigenvectors.T.dot(ones))
+
+    return [int(round(count)) for count in counts]
+
+
+_STRATEGIES = {
+    'layers': _count_with_layers,
+    'matrix_power': _count_with_matrix_power,
+    'eigen': _count_with_eigen,
+}
+
+
+# Enumeration of the walks themselves, not just their count.
+#
+# Walks are generated iteratively with an explicit stack, so there is no recursion
+# limit. Walks are produced in a fixed order (the order of the targets in the graph
+# edges), which allows addressing them by index: with the count of walks of each
+# length from each node, whole subtrees of walks can be jumped over without
+# generating them.
+#
+# Those counts are also used to avoid going into dead ends, so besides the current
+# walk, memory goes to the table of counts: length * nodes numbers, growing in
+# digits with the length.
+
+
+def iter_walks(graph, start, length, skip=0, limit=None, prefix=None):
+    """
+    Lazily yields every walk of `length` moves starting at `start`, as tuples of labels
+
+    :param skip: Amount of walks to jump over before yielding the first one
+    :param limit: Max amount of walks to yield
+    :param prefix: Only yield walks starting with these labels. It must start with `start`.
+        `skip` and `limit` are then relative to the walks with this prefix.
+
+    """
+    labels = graph._labels
+    adjacency = graph._adjacency
+
+    path = _prefix_to_path(graph, start, prefix)
+    remaining = length - (len(path) - 1)
+
+    if remaining < 0:
+        raise ValueError('Prefix is longer than the walk')
+
+    if limit is not None and limit <= 0:
+        return
+
+    layers = _count_layers(graph, remaining)
+
+    if skip >= layers[remaining][path[-1]]:
+        return
+
+    if not remaining:
+        yield tuple(labels[node] for node in path)
+        return
+
+    # positions[i] is the index of the next target to explore from the
+    # (len(path) - len(positions) + i)-th node of the path
+    positions = []
+
+    # Go straight to the `skip`-th walk
+    for moves_left in range(remaining, 0, -1):
+        for target_idx, target in enumerate(adjacency[path[-1]]):
+            if skip < layers[moves_left - 1][target]:
+                break
+
+            skip -= layers[moves_left - 1][target]
+
+        # Upper levels will go on with the next target when coming back
+        positions.append(target_idx + 1)
+        path.append(target)
+
+    # The last move is done by the loop below, which yields the walk
+    positions[-1] -= 1
+    path.pop()
+    yielded = 0
+
+    while positions:
+        targets = adjacency[path[-1]]
+        target_idx = positions[-1]
+
+        if target_idx == len(targets):
+            positions.pop()
+            path.pop()
+            continue
+
+        positions[-1] = target_idx + 1
+        target = targets[target_idx]
+
+        if len(positions) < remaining:
+            # Dead ends don't lead to any walk, don't bother going in
+            if layers[remaining - len(positions) - 1][target]:
+                path.append(target)
+                positions.append(0)
+
+            continue
+
+        path.append(target)
+        yield tuple(labels[node] for node in path)
+        path.pop()
+
+        yielded += 1
+
+        if yielded == limit:
+            return
+
+
+def walk_at(graph, start, length, index):
+    """
+    Returns the walk that iter_walks() would yield in position `index`, without
+    generating the previous ones
+
+    """
+    layers = _count_layers(graph, length)
+
+    return _walk_at(graph, layers, graph._index[start], length, index)
+
+
+def sample_walks(graph, start, length, k, rng=random):
+    """
+    Returns k walks picked uniformly at random (with replacement)
+
+    """
+    start_node = graph._index[start]
+    layers = _count_layers(graph, length)
+    total = layers[length][start_node]
+
+    if not total:
+        raise ValueError('There are no walks to sample from')
+
+    # The counts are calculated once, and each sample just descends through them
+    return [_walk_at(graph, layers, start_node, length, rng.randrange(total)) for _ in range(k)]
+
+
+def _walk_at(graph, layers, start_node, length, index):
+    """
+    Returns the `index`-th walk from the given node, with the counts from _count_layers()
+
+    """
+    if not 0 <= index < layers[length][start_node]:
+        raise IndexError('walk index out of range')
+
+    adjacency = graph._adjacency
+    path = [start_node]
+
+    for moves_left in range(length, 0, -1):
+        for target in adjacency[path[-1]]:
+            walks_through_target = layers[moves_left - 1][target]
+
+            if index < walks_through_target:
+                break
+
+            index -= walks_through_target
+
+        path.append(target)
+
+    return tuple(graph._labels[node] for node in path)
+
+
+def shard_prefixes(graph, start, length, shard_length=1):
+    """
+    Returns the prefixes of `shard_length` moves that split the walks in disjoint shards.
+    Prefixes that don't lead to any full walk are left out.
+
+    """
+    shard_length = min(shard_length, length)
+    remaining = length - shard_length
+    layers = _count_layers(graph, remaining)
+
+    return [
+        prefix
+        for prefix in iter_walks(graph, start, shard_length)
+        if layers[remaining][graph._index[prefix[-1]]]
+    ]
+
+
+def map_shards(pool, fn, graph, start, length, shard_length=1):
+    """
+    Splits the walks in shards by prefix and runs fn(walks_iterator) on each shard in
+    the given process pool (e.g. multiprocessing.Pool). Yields the results in prefix
+    order.
+
+    Each worker enumerates its shard lazily, so fn should reduce the walks to something
+    small (a count, a best walk...) rather than return them all. fn must be picklable.
+
+    """
+    prefixes = shard_prefixes(graph, start, length, shard_length)
+
+    return pool.imap(_ShardTask(fn, graph, start, length), prefixes)
+
+
+class _ShardTask(object):
+    """
+    Picklable callable that processes the shard of walks with a given prefix
+
+    """
+
+    def __init__(self, fn, graph, start, length):
+        self.fn = fn
+        self.graph = graph
+        self.start = start
+        self.length = length
+
+    def __call__(self, prefix):
+        return self.fn(iter_walks(self.graph, self.start, self.length, prefix=prefix))
+
+
+def _prefix_to_path(graph, start, prefix):
+    """
+    Returns the prefix as a list of node indices, checking it is a valid walk
+
+    """
+    if prefix is None:
+        prefix = [start]
+
+    if not prefix or prefix[0] != start:
+        raise ValueError('Prefix must begin with the start label')
+
+    path = [graph._index[label] for label in prefix]
+
+    for source, target in zip(path, path[1:]):
+        if target not in graph._adjacency[source]:
+            raise ValueError('Prefix is not a valid walk')
+
+    return path
+
+
+def _count_layers(graph, length):
+    """
+    Returns a list whose k-th element is the layer of walk counts for k moves
+
+    """
+    if length < 0:
+        raise ValueError('length must be non-negative, got %r' % (length,))
+
+    layers = [[1] * len(graph)]
+
+    for _ in range(length):
+        prev = layers[-1]
+        layers.append([sum(prev[target] for target in targets) for targets in graph._adjacency])
+
+    return layers
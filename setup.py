@@ -0,0 +1,18 @@
+# coding: utf-8
+
+from setuptools import setup, find_packages
+
+
+setup(
+    name='datastructures',
+    version='0.1.0',
+    description='Just a place to play with data structures',
+    long_description=open('README.rst').read(),
+    url='https://github.com/bgusach/datastructures',
+    packages=find_packages(),
+    python_requires='>=3.7',
+    extras_require={
+        'numpy': ['numpy'],
+        'test': ['pytest'],
+    },
+)